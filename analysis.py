@@ -2,27 +2,39 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import altair as alt
-import json
-from openai import OpenAI
+import os
+from core.workout_schema import workout_frame
+from core.workout_rollup import days_in_period, rollup_aggregates, rollup_frame, rollup_metrics, rollup_totals
+from core.workout_store import load_adherence, load_rollup, log_path, read_range
+from core.downsampling import bucket_counts, choose_bucket, downsample_lines
+from core.report_cache import ReportCache, aggregate_fingerprint
+from core.training_load import CHRONIC_DAYS, load_summary, row_load, set_matrices, training_load
+from core.history_query import HistoryQuery
+from core.history_export import EXPORT_FORMATS, deferred_export, export_archive, export_file, export_formats
+from core.cohort import aggregate_cohort
+from core.adherence import ADHERENCE_DAYS, adherence_summary
+from core.profiling import section
 
-def get_ai_analysis(df):
+def get_ai_analysis(aggregates):
     """
     Get AI analysis of workout history with time period consideration
     
     Args:
-        df: pandas DataFrame containing workout data
+        aggregates (dict): Workout aggregates from rollup_aggregates
     """
     try:
+        from openai import OpenAI
         client = OpenAI(api_key=st.secrets["API_KEY"])
         
-        start_date = df['date'].min().strftime('%Y-%m-%d')
-        end_date = df['date'].max().strftime('%Y-%m-%d')
-        total_days = (df['date'].max() - df['date'].min()).days + 1
-        total_workouts = len(df)
-        days_active = df['date'].nunique()
-        muscle_groups = df['muscle_group'].value_counts().to_dict()
-        workout_types = df['workout_type'].value_counts().to_dict()
-        difficulty_levels = df['difficulty'].value_counts().to_dict()
+        start_date = aggregates['start_date']
+        end_date = aggregates['end_date']
+        total_days = aggregates['total_days']
+        total_workouts = aggregates['total_workouts']
+        days_active = aggregates['days_active']
+        muscle_groups = aggregates['muscle_groups']
+        workout_types = aggregates['workout_types']
+        difficulty_levels = aggregates['difficulty_levels']
+        load = aggregates.get('training_load', {})
         
         prompt = f"""
         As a fitness expert, analyze the workout history from {start_date} to {end_date} ({total_days} days):
@@ -31,11 +43,14 @@ def get_ai_analysis(df):
         - Muscle groups targeted (with frequency): {muscle_groups}
         - Types of workouts performed: {workout_types}
         - Difficulty levels: {difficulty_levels}
+        - Training volume (lbs x reps) per muscle group: {load.get('muscle_group_volume')}
+        - Best estimated one-rep max (Epley) of the main exercises: {load.get('exercise_best_e1rm')}
+        - Acute (7-day) vs chronic (28-day) average daily volume: {load.get('acute_daily_volume')} vs {load.get('chronic_daily_volume')}, ratio {load.get('acute_chronic_ratio')}
 
         Provide a brief analysis including:
         1. Overall consistency and commitment
         2. Balance of muscle groups (any imbalances?)
-        3. Progression in difficulty over this time period
+        3. Progression in difficulty and strength over this time period, and whether the current training load is ramping up too fast (ratio well above 1.3) or detraining (well below 0.8)
         4. Specific recommendations for improvement based on this time period
         Keep the analysis concise but specific to this user's data.
         Consider the time period when making your analysis - if it's a short period, focus on initial progress. 
@@ -59,76 +74,169 @@ def get_ai_analysis(df):
     except Exception as e:
         return f"Unable to generate AI analysis: {str(e)}"
 
-def load_workout_log(username, time_period='all'):
+def get_cached_ai_analysis(username, aggregates, time_period):
+    """
+    Return the AI analysis for these aggregates, generating it only if the same
+    aggregates and time period have not been analyzed before.
+
+    Returns:
+        tuple: (report, whether it came from the cache)
+    """
+    cache = ReportCache(username)
+    fingerprint = aggregate_fingerprint(aggregates, time_period)
+    report = cache.get(fingerprint)
+    if report is not None:
+        return report, True
+
+    report = get_ai_analysis(aggregates)
+    if not report.startswith("Unable to generate AI analysis"):
+        cache.put(fingerprint, report)
+    return report, False
+
+@st.cache_data(max_entries=16)
+def read_workout_log(username, start, mtime):
+    """
+    Read a workout log from `start` on into the typed workout frame, opening only
+    the month partitions that cover it, once per file version.
+
+    Args:
+        username (str): Owner of the log
+        start (str): First 'YYYY-MM-DD' date to read, or None for the whole log
+        mtime (float): Modification time of the log file, so a saved log is re-read
+    """
+    return workout_frame(read_range(username, start), username=username)
+
+@st.cache_resource(max_entries=16)
+def get_history_query(username, start, mtime):
+    """
+    Indexed, date-sorted exercise history for one version of a workout log.
+
+    Args:
+        username (str): Owner of the log
+        start (str): First 'YYYY-MM-DD' date to index, or None for the whole log
+        mtime (float): Modification time of the log file, so a saved log is re-indexed
+    """
+    df = read_workout_log(username, start, mtime)
+    return None if df is None else HistoryQuery(df)
+
+def is_admin(username):
+    """Whether a user is listed in the ADMIN_USERS secret."""
+    try:
+        return username in st.secrets.get("ADMIN_USERS", [])
+    except FileNotFoundError:
+        return False
+
+def create_cohort_charts(cohort):
+    """Create the cross-user muscle group and weekly activity charts for admins"""
+    if not cohort['entries']:
+        return None, None
+
+    muscle_data = pd.DataFrame({
+        'muscle_group': list(cohort['muscle_groups']),
+        'count': list(cohort['muscle_groups'].values()),
+        'users': [cohort['muscle_group_users'][muscle] for muscle in cohort['muscle_groups']]
+    })
+    muscle_chart = alt.Chart(muscle_data).mark_bar().encode(
+        x=alt.X('count:Q', title='Exercises Logged'),
+        y=alt.Y('muscle_group:N', sort='-x', title='Muscle Group'),
+        tooltip=['muscle_group', 'count', 'users']
+    ).properties(height=300)
+
+    weeks = sorted(cohort['weekly_entries'])
+    weekly_data = pd.DataFrame({
+        'week': pd.to_datetime(weeks),
+        'active users': [cohort['weekly_active_users'][week] for week in weeks],
+        'exercises': [cohort['weekly_entries'][week] for week in weeks]
+    }).melt(id_vars=['week'], var_name='measure', value_name='count')
+    weekly_chart = alt.Chart(weekly_data).mark_line(point=True).encode(
+        x=alt.X('week:T', title='Week'),
+        y=alt.Y('count:Q', title='Count'),
+        color=alt.Color('measure:N', title=None),
+        tooltip=[alt.Tooltip('week:T', format='%Y-%m-%d'), 'measure', 'count']
+    ).properties(height=300)
+    return muscle_chart, weekly_chart
+
+def create_adherence_charts(summary):
+    """Create the per-muscle and weekly plan adherence charts"""
+    if not summary['planned']:
+        return None, None
+
+    muscle_data = pd.DataFrame(summary['muscles'])
+    muscle_chart = alt.Chart(muscle_data).mark_bar().encode(
+        x=alt.X('rate:Q', title='Adherence', axis=alt.Axis(format='%'), scale=alt.Scale(domain=[0, 1])),
+        y=alt.Y('muscle_group:N', sort='-x', title='Muscle Group'),
+        tooltip=['muscle_group', 'planned', 'done', alt.Tooltip('rate:Q', format='.0%')]
+    ).properties(height=300)
+
+    weekly_data = pd.DataFrame(summary['weeks'])
+    weekly_data['week'] = pd.to_datetime(weekly_data['week'])
+    weekly_chart = alt.Chart(weekly_data).mark_line(point=True).encode(
+        x=alt.X('week:T', title='Week'),
+        y=alt.Y('rate:Q', title='Adherence', axis=alt.Axis(format='%'), scale=alt.Scale(domain=[0, 1])),
+        tooltip=[alt.Tooltip('week:T', format='%Y-%m-%d'), 'planned', 'done', alt.Tooltip('rate:Q', format='.0%')]
+    ).properties(height=300)
+    return muscle_chart, weekly_chart
+
+def period_cutoff(time_period):
+    """Earliest datetime included in a time period ('all', '30d' or '7d')."""
+    today = datetime.now()
+    if time_period == '30d':
+        return today - timedelta(days=30)
+    if time_period == '7d':
+        return today - timedelta(days=7)
+    return None
+
+def history_start(time_period):
+    """
+    First date loaded for a time period: the period plus the chronic training
+    load window before it, as 'YYYY-MM-DD', or None for the whole log.
+    """
+    cutoff = period_cutoff(time_period)
+    if cutoff is None:
+        return None
+    return (cutoff - timedelta(days=CHRONIC_DAYS)).date().isoformat()
+
+def load_history_query(username, time_period='all'):
     """
-    Load and process workout log history with time period filtering
+    Load the indexed workout history covering a time period
     
     Args:
         username (str): Username to load data for
         time_period (str): 'all', '30d', or '7d' for filtering
     """
-    log_file = f"file/workout_log_hist_{username}.json"
     try:
-        with open(log_file, 'r') as f:
-            memories = json.load(f)
-            
-        if not memories:
-            st.warning("No workout data found. Start working out to see analysis!")
-            return None
-            
-        df = pd.DataFrame(memories)
-        df['date'] = pd.to_datetime(df['date'])
-        
-        # Filter based on time period
-        if time_period != 'all':
-            today = datetime.now()
-            if time_period == '30d':
-                cutoff_date = today - timedelta(days=30)
-            elif time_period == '7d':
-                cutoff_date = today - timedelta(days=7)
-            df = df[df['date'] >= cutoff_date]
-            
-        return df
-    except (FileNotFoundError, json.JSONDecodeError):
+        query = get_history_query(username, history_start(time_period), os.path.getmtime(log_path(username)))
+    except FileNotFoundError:
+        query = None
+    if query is None:
         st.warning("No workout data found. Start working out to see analysis!")
-        return None
+    return query
 
-def create_progression_chart(df):
+def create_progression_chart(df, full_resolution=False):
     """Create a line chart showing progression for specific exercises over time"""
     if df is None or df.empty:
         return None
         
     # Extract exercise names for selection
-    exercise_list = sorted(df['exercise_name'].unique().tolist())
+    exercise_list = sorted(df['exercise_name'].dropna().unique().tolist())
     selected_exercise = st.selectbox('Select Exercise to Track', exercise_list)
     
-    # Filter data for selected exercise
-    exercise_data = df[df['exercise_name'] == selected_exercise].copy()
-    
-    # Process the 'lbs/bw_reps' columns to extract numerical values
-    def extract_weight(value):
-        try:
-            # Extract the first number from the string
-            import re
-            numbers = re.findall(r'\d+', str(value))
-            return float(numbers[0]) if numbers else None
-        except:
-            return None
-    
-    # Process each set column
-    for set_num in [1, 2, 3]:
-        col_name = f'lbs/bw_reps for {["first", "second", "third"][set_num-1]} set'
-        exercise_data[f'set_{set_num}_weight'] = exercise_data[col_name].apply(extract_weight)
-    
+    # Filter data for selected exercise; set weights were parsed at load time
+    exercise_data = df.loc[df['exercise_name'] == selected_exercise,
+                           ['date', 'set_1_weight', 'set_2_weight', 'set_3_weight', 'set_1_reps', 'set_2_reps', 'set_3_reps']]
+    exercise_data['estimated_1rm'] = row_load(*set_matrices(exercise_data))[1]
+
     # Prepare data for visualization
     progression_data = pd.melt(
         exercise_data,
         id_vars=['date'],
-        value_vars=['set_1_weight', 'set_2_weight', 'set_3_weight'],
+        value_vars=['set_1_weight', 'set_2_weight', 'set_3_weight', 'estimated_1rm'],
         var_name='set',
         value_name='weight'
     )
-    
+    if not full_resolution:
+        progression_data = downsample_lines(progression_data, 'date', 'weight', 'set')
+
     # Create multi-line chart
     chart = alt.Chart(progression_data).mark_line(point=True).encode(
         x=alt.X('date:T', 
@@ -137,7 +245,7 @@ def create_progression_chart(df):
         y=alt.Y('weight:Q', 
                 title='Weight (lbs)'),
         color=alt.Color('set:N', 
-                       title='Set Number',
+                       title='Series',
                        scale=alt.Scale(scheme='category10')),
         tooltip=[
             alt.Tooltip('date:T', title='Date', format='%Y-%m-%d'),
@@ -154,12 +262,12 @@ def create_progression_chart(df):
     
     return chart
 
-def create_workout_type_chart(df):
-    """Create a chart showing workout type distribution"""
-    if df is None or df.empty:
+def create_workout_type_chart(days):
+    """Create a chart showing workout type distribution from rollup days"""
+    if not days:
         return None
-        
-    workout_counts = df['workout_type'].value_counts()
+
+    workout_counts = rollup_totals(days, 'workout_type')
     
     chart = alt.Chart(workout_counts.reset_index()).mark_bar().encode(
         x=alt.X('workout_type:N', title='Workout Type'),
@@ -171,12 +279,12 @@ def create_workout_type_chart(df):
     
     return chart
 
-def create_muscle_group_chart(df):
-    """Create a chart showing muscle group distribution"""
-    if df is None or df.empty:
+def create_muscle_group_chart(days):
+    """Create a chart showing muscle group distribution from rollup days"""
+    if not days:
         return None
-        
-    muscle_counts = df['muscle_group'].value_counts()
+
+    muscle_counts = rollup_totals(days, 'muscle_group')
     
     chart = alt.Chart(muscle_counts.reset_index()).mark_bar().encode(
         x=alt.X('muscle_group:N', title='Muscle Group'),
@@ -188,18 +296,22 @@ def create_muscle_group_chart(df):
     
     return chart
 
-def create_daily_workout_count_chart(df):
-    """Create a stacked area chart for daily workouts."""
-    if df.empty:
+def create_daily_workout_count_chart(days, full_resolution=False):
+    """Create a stacked area chart for daily workouts from rollup days.
+
+    Long ranges are bucketed by week or month unless full_resolution is set.
+    """
+    if not days:
         return None
     category = st.radio("Select Category", ["Workout Type", "Muscle Group", "Difficulty"])
     col = category.replace(" ", "_").lower()
-    daily_counts = df.groupby(['date', col]).size().unstack(fill_value=0)
-    daily_data = daily_counts.stack().reset_index()
-    daily_data.columns = ['date', col, 'count']
+    daily_counts = rollup_frame(days, col).pivot(index='date', columns=col, values='count').fillna(0)
+    freq = 'D' if full_resolution else choose_bucket(days[0][0], days[-1][0])
+    daily_data = bucket_counts(daily_counts, col, freq)
+    period = {'D': 'Daily', 'W': 'Weekly', 'MS': 'Monthly', 'YS': 'Yearly'}[freq]
     return alt.Chart(daily_data).mark_area().encode(
         x='date:T', y='count:Q', color=f'{col}:N'
-    ).properties(title=f'Daily Count by {category}')
+    ).properties(title=f'{period} Count by {category}')
 
 st.title("📊 Workout Analysis")
 if 'username' in st.session_state:
@@ -217,9 +329,21 @@ if 'username' in st.session_state:
         'Last 7 Days': '7d'
     }[time_period]
 
-    df = load_workout_log(username, period_param)
+    with section('load'):
+        query = load_history_query(username, period_param)
+        rollup = load_rollup(username)
+        adherence = load_adherence(username)
 
-    if df is not None:
+    if query is not None and rollup is not None:
+        cutoff = period_cutoff(period_param)
+        with section('aggregate'):
+            df = query.matching({}, cutoff)
+            days = days_in_period(rollup, cutoff)
+            metrics = rollup_metrics(days)
+            load = training_load(query.df, cutoff, datetime.now().date())
+            adherence_stats = None
+            if adherence is not None:
+                adherence_stats = adherence_summary(adherence, cutoff.date().isoformat() if cutoff else None)
         # Add start date to header
         start_date = df['date'].min().strftime('%Y-%m-%d')
         st.write(f"Tracking since: {start_date}")
@@ -228,90 +352,160 @@ if 'username' in st.session_state:
 
         if st.button("Generate WorkoutBot Analysis"):
             with st.spinner("Analyzing your workout history..."):
-                analysis = get_ai_analysis(df)
+                aggregates = rollup_aggregates(days)
+                # As of the last logged day, not today, so a report stays cached until new workouts
+                aggregates['training_load'] = load_summary(load, as_of=aggregates['end_date'])
+                if adherence_stats and adherence_stats['planned']:
+                    aggregates['plan_adherence'] = {key: adherence_stats[key] for key in ('rate', 'planned', 'done', 'muscles')}
+                analysis, cached = get_cached_ai_analysis(username, aggregates, period_param)
                 st.markdown(analysis)
+                if cached:
+                    st.caption("No new workouts since this analysis was generated.")
         
         st.divider()
 
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Workouts", len(df))
+            st.metric("Total Workouts", metrics['total_workouts'])
         with col2:
-            st.metric("Unique Exercises", df['exercise_name'].nunique())
+            st.metric("Unique Exercises", metrics['unique_exercises'])
         with col3:
-            st.metric("Days Active", df['date'].nunique())
+            st.metric("Days Active", metrics['days_active'])
         
 
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Workout Types")
-            workout_chart = create_workout_type_chart(df)
+            with section('chart_build'):
+                workout_chart = create_workout_type_chart(days)
             if workout_chart:
-                st.altair_chart(workout_chart, use_container_width=True)
+                with section('render'):
+                    st.altair_chart(workout_chart, use_container_width=True)
         
         with col2:
             st.subheader("Muscle Groups")
-            muscle_chart = create_muscle_group_chart(df)
+            with section('chart_build'):
+                muscle_chart = create_muscle_group_chart(days)
             if muscle_chart:
-                st.altair_chart(muscle_chart, use_container_width=True)
+                with section('render'):
+                    st.altair_chart(muscle_chart, use_container_width=True)
+
+        full_resolution = st.toggle("Show full resolution", value=False,
+                                    help="Plot every day and every logged set instead of a downsampled view.")
 
         st.subheader("Daily Exercise Distribution")
-        daily_stack_chart = create_daily_workout_count_chart(df)
+        with section('chart_build'):
+            daily_stack_chart = create_daily_workout_count_chart(days, full_resolution)
         if daily_stack_chart:
-            st.altair_chart(daily_stack_chart, use_container_width=True)
+            with section('render'):
+                st.altair_chart(daily_stack_chart, use_container_width=True)
 
         st.subheader("Exercise Progression Tracking")
         st.write("Track your strength progression for specific exercises over time")
-        progression_chart = create_progression_chart(df)
+        with section('chart_build'):
+            progression_chart = create_progression_chart(df, full_resolution)
         if progression_chart:
-            st.altair_chart(progression_chart, use_container_width=True)
+            with section('render'):
+                st.altair_chart(progression_chart, use_container_width=True)
             
+        st.subheader("Plan Adherence")
+        st.write(f"How many WorkoutBot suggestions you logged within {ADHERENCE_DAYS} days")
+        if adherence_stats and adherence_stats['planned']:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Adherence", f"{adherence_stats['rate']:.0%}")
+            with col2:
+                st.metric("Planned", adherence_stats['planned'])
+            with col3:
+                st.metric("Pending", adherence_stats['pending'])
+            with section('chart_build'):
+                adherence_muscle_chart, adherence_weekly_chart = create_adherence_charts(adherence_stats)
+            with section('render'):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.altair_chart(adherence_muscle_chart, use_container_width=True)
+                with col2:
+                    st.altair_chart(adherence_weekly_chart, use_container_width=True)
+        else:
+            st.info("No completed WorkoutBot plans in this period yet.")
+
         # exercise history
         st.subheader("Exercise History")
         
         # Search for details
         col1, col2, col3 = st.columns(3)
         with col1:
-            workout_types = ['All'] + sorted(df['workout_type'].unique().tolist())
-            selected_type = st.selectbox('Filter by Workout Type', workout_types)
+            selected_type = st.selectbox('Filter by Workout Type', ['All'] + query.options('workout_type'))
         
         with col2:
-            muscle_groups = ['All'] + sorted(df['muscle_group'].unique().tolist())
-            selected_muscle = st.selectbox('Filter by Muscle Group', muscle_groups)
+            selected_muscle = st.selectbox('Filter by Muscle Group', ['All'] + query.options('muscle_group'))
             
         with col3:
-            difficulties = ['All'] + sorted(df['difficulty'].unique().tolist())
-            selected_difficulty = st.selectbox('Filter by Difficulty', difficulties)
+            selected_difficulty = st.selectbox('Filter by Difficulty', ['All'] + query.options('difficulty'))
         
-        # filters
-        filtered_df = df.copy()
-        if selected_type != 'All':
-            filtered_df = filtered_df[filtered_df['workout_type'] == selected_type]
-        if selected_muscle != 'All':
-            filtered_df = filtered_df[filtered_df['muscle_group'] == selected_muscle]
-        if selected_difficulty != 'All':
-            filtered_df = filtered_df[filtered_df['difficulty'] == selected_difficulty]
+        filters = {
+            'workout_type': selected_type,
+            'muscle_group': selected_muscle,
+            'difficulty': selected_difficulty
+        }
         
-        # filtered data
+        # filtered data, one page at a time
         display_columns = [
             'date', 'exercise_name', 'muscle_group', 'workout_type', 'difficulty',
             'lbs/bw_reps for first set', 'lbs/bw_reps for second set', 'lbs/bw_reps for third set'
         ]
         
-        st.dataframe(
-            filtered_df[display_columns].sort_values('date', ascending=False),
-            hide_index=True
-        )
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page_size = st.selectbox('Rows per page', [25, 50, 100], index=1)
+        page_count = max(1, -(-query.count(filters, cutoff) // page_size))
+        with col2:
+            page_number = st.number_input('Page', min_value=1, max_value=page_count, value=1, step=1)
+        
+        with section('aggregate'):
+            page_df, total = query.page(filters, page_number - 1, page_size, cutoff, display_columns)
+        with section('render'):
+            st.dataframe(page_df, hide_index=True)
+        first_row = (page_number - 1) * page_size + 1 if total else 0
+        st.caption(f"Showing {first_row}-{first_row + len(page_df) - 1 if total else 0} of {total} exercises")
         
         # Export your data
-        if st.button('Export Exercise History'):
-            csv = filtered_df.to_csv(index=False)
+        export_format = st.selectbox('Export Format', export_formats())
+        extension, mime = EXPORT_FORMATS[export_format]
+        st.download_button(
+            label=f"Export Exercise History ({export_format})",
+            data=deferred_export(lambda: export_file(query.matching(filters, cutoff), export_format)),
+            file_name=f"exercise_history.{extension}",
+            mime=mime,
+            on_click='ignore'
+        )
+
+        if is_admin(username):
             st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name="exercise_history.csv",
-                mime="text/csv"
+                label=f"Export Full Archive ({export_format})",
+                data=deferred_export(lambda: export_archive(export_format)),
+                file_name=f"workout_logs_{extension}.zip",
+                mime="application/zip",
+                on_click='ignore'
             )
+
+            st.divider()
+            st.subheader("Cohort Dashboard")
+            if st.button("Aggregate All Users"):
+                with st.spinner("Aggregating workout logs across users..."):
+                    cohort, stats = aggregate_cohort()
+                st.caption(f"{stats['files']} logs, {stats['recomputed']} re-read, {stats['reused']} from cache")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Active Users", cohort['users'])
+                with col2:
+                    st.metric("Exercises Logged", cohort['entries'])
+                muscle_chart, weekly_chart = create_cohort_charts(cohort)
+                if muscle_chart:
+                    st.write("Most Trained Muscle Groups")
+                    st.altair_chart(muscle_chart, use_container_width=True)
+                    st.write("Weekly Activity")
+                    st.altair_chart(weekly_chart, use_container_width=True)
 else:
     st.warning("Please Login to access your analysis")
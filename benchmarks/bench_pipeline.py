@@ -0,0 +1,166 @@
+"""
+Latency benchmark for the WorkoutBot chat pipeline, fully offline.
+
+Runs a corpus of prompts through WorkoutPipeline against the replay stand-ins
+and reports per-turn latency, per-stage breakdown and upstream call counts.
+
+    python -m benchmarks.bench_pipeline --openai-ms 400 --youtube-ms 150 --repeat 3
+"""
+import argparse
+import json
+import time
+
+from core.equipment_index import load_equipment_index
+from core.tracing import Tracer, percentile
+from core.workout_pipeline import WorkoutPipeline, drop_lookups, interleave_lookups, wait_lookups
+from benchmarks.replay import FakeNinjas, FakeOpenAI, FakeYouTube, Latency, load_recordings
+
+
+def run_benchmark(prompts, recordings, openai_latency, stream_latency, ninjas_latency, youtube_latency,
+                  difficulty='beginner', workout_type='strength', repeat=1, turn_budget=None,
+                  pipelined=False):
+    """
+    Run every prompt `repeat` times through a fresh pipeline wired to the stand-ins.
+    With `pipelined`, the turn runs the way workout.py does in pipelined mode:
+    video lookups overlap the streamed answer.
+
+    Returns:
+        dict: 'turns' (per-turn latency in ms), 'stages' (Tracer summary),
+        'calls' (call counts per stand-in), 'errors' and 'mismatches' (recorded
+        turns whose extracted exercises differ from the recorded ones)
+    """
+    tracer = Tracer()
+    openai_client = FakeOpenAI(recordings, openai_latency, stream_latency)
+    ninjas = FakeNinjas(recordings, ninjas_latency)
+    youtube = FakeYouTube(recordings, youtube_latency)
+    errors = []
+    mismatches = []
+    pipeline = WorkoutPipeline(openai_client, youtube, 'replay-key', http=ninjas, tracer=tracer,
+                               equipment_index=load_equipment_index(), notify=errors.append)
+    if turn_budget is not None:
+        pipeline.turn_budget = turn_budget
+
+    turns = []
+    for _ in range(repeat):
+        for prompt in prompts:
+            messages = [{'role': 'user', 'content': prompt}]
+            turn_id = tracer.start_turn()
+            start = time.perf_counter()
+            first_token_ms = None
+            try:
+                with tracer.span('turn', turn_id):
+                    turn = pipeline.prepare_turn(prompt, messages, None, difficulty, workout_type,
+                                                 turn_id=turn_id, pipelined=pipelined)
+                    deadline = turn['deadline']
+                    workouts = turn['workouts']
+                    lookups = {}
+                    answer = []
+                    with tracer.span('final_stream', turn_id):
+                        stream = pipeline.stream_answer(turn['messages'], deadline)
+                        if stream is not None and pipelined:
+                            stream = interleave_lookups(stream, lookups, lambda exercise, result: None,
+                                                        pipeline.start_mentioned_lookups(turn['candidates'], deadline,
+                                                                                         lookups, turn_id))
+                        for chunk in stream or []:
+                            if first_token_ms is None:
+                                first_token_ms = (time.perf_counter() - start) * 1000
+                            answer.append(chunk.choices[0].delta.content or '')
+                    if pipelined and stream is not None:
+                        with tracer.span('extract_exercises', turn_id):
+                            workouts = pipeline.extract_exercises(''.join(answer), timeout=deadline.budget('extract_exercises'))
+                        drop_lookups(lookups, workouts)
+                        pipeline.start_video_lookups(workouts, deadline, lookups, turn_id)
+                        with tracer.span('video_links', turn_id):
+                            wait_lookups(lookups, deadline, lambda exercise, result: None)
+                # Replay is deterministic, so anything extracted must be what was recorded
+                expected = recordings['turns'].get(prompt, {}).get('exercises')
+                if workouts and expected is not None and workouts != expected:
+                    mismatches.append(f"{prompt!r}: extracted {workouts}, recorded {expected}")
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+                turn = {'degraded': ['crashed']}
+            turns.append({
+                'prompt': prompt,
+                'latency_ms': (time.perf_counter() - start) * 1000,
+                'first_token_ms': first_token_ms,
+                'degraded': turn['degraded']
+            })
+
+    return {
+        'turns': turns,
+        'stages': tracer.summary(),
+        'calls': {
+            'openai': dict(openai_client.counter.calls),
+            'api_ninjas': dict(ninjas.counter.calls),
+            'youtube': dict(youtube.counter.calls)
+        },
+        'errors': errors,
+        'mismatches': mismatches
+    }
+
+
+def print_report(result):
+    latencies = sorted(turn['latency_ms'] for turn in result['turns'])
+    first_tokens = sorted(turn['first_token_ms'] for turn in result['turns'] if turn['first_token_ms'] is not None)
+    degraded = sum(1 for turn in result['turns'] if turn['degraded'])
+    print(f"Turns: {len(latencies)}   degraded: {degraded}   errors: {len(result['errors'])}   "
+          f"extraction mismatches: {len(result['mismatches'])}")
+    for mismatch in result['mismatches']:
+        print(f"MISMATCH {mismatch}")
+    print(f"Turn latency ms   p50 {percentile(latencies, 50):8.1f}   p95 {percentile(latencies, 95):8.1f}   max {latencies[-1]:8.1f}")
+    if first_tokens:
+        print(f"First token ms    p50 {percentile(first_tokens, 50):8.1f}   p95 {percentile(first_tokens, 95):8.1f}   max {first_tokens[-1]:8.1f}")
+    print()
+    print(f"{'stage':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for row in sorted(result['stages'], key=lambda r: -r['p50_ms']):
+        print(f"{row['stage']:<22}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+    print()
+    for service, calls in result['calls'].items():
+        print(f"{service:<12}" + ', '.join(f"{name}={count}" for name, count in sorted(calls.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help="JSON file with a list of prompts (default: recorded turns)")
+    parser.add_argument('--recordings', help="Recordings file (default: benchmarks/recordings.json)")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--openai-ms', type=float, default=300, help="Latency per completion")
+    parser.add_argument('--stream-chunk-ms', type=float, default=20, help="Latency per streamed chunk")
+    parser.add_argument('--ninjas-ms', type=float, default=150)
+    parser.add_argument('--youtube-ms', type=float, default=200)
+    parser.add_argument('--jitter', type=float, default=0.2, help="Jitter as a fraction of the mean")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Failure probability for every service")
+    parser.add_argument('--turn-budget', type=float, help="Per-turn deadline in seconds (default: pipeline's)")
+    parser.add_argument('--pipelined', action='store_true', help="Overlap video lookups with the streamed answer")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_out', help="Also write the raw result to this file")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings) if args.recordings else load_recordings()
+    if args.corpus:
+        with open(args.corpus, 'r') as f:
+            prompts = json.load(f)
+    else:
+        prompts = list(recordings['turns'])
+
+    def latency(mean_ms, offset):
+        return Latency(mean_ms, mean_ms * args.jitter, args.failure_rate, seed=args.seed + offset)
+
+    result = run_benchmark(
+        prompts, recordings,
+        openai_latency=latency(args.openai_ms, 1),
+        stream_latency=Latency(args.stream_chunk_ms, args.stream_chunk_ms * args.jitter, seed=args.seed + 2),
+        ninjas_latency=latency(args.ninjas_ms, 3),
+        youtube_latency=latency(args.youtube_ms, 4),
+        repeat=args.repeat,
+        turn_budget=args.turn_budget,
+        pipelined=args.pipelined
+    )
+    print_report(result)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
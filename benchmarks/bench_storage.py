@@ -0,0 +1,208 @@
+"""
+Benchmark for the storage and analysis paths behind the Streamlit pages, headless.
+
+Generates synthetic histories into a scratch directory, then times each
+operation the pages run against them: loading the history, the Save Log upsert,
+bulk delete, Save All Changes, the exercise memory tracker, the analysis
+aggregates, plan adherence and calendar event construction. Results can be
+saved as a baseline and later runs compared against it to catch regressions.
+
+    python -m benchmarks.bench_storage --rows 100000 --repeat 5 --save-baseline
+    python -m benchmarks.bench_storage --rows 100000 --repeat 5 --compare
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from core.tracing import percentile
+from benchmarks.synthetic import generate_memories, read_reference, write_dataset
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# Rows saved or deleted per Save Log / Delete Selected Logs click
+EDIT_ROWS = 20
+
+
+@contextmanager
+def scratch_dir(keep=None):
+    """Run with a scratch directory as the working directory, since storage paths are relative to it."""
+    source = os.getcwd()
+    path = keep or tempfile.mkdtemp(prefix='workout-bench-')
+    os.chdir(path)
+    try:
+        yield source
+    finally:
+        os.chdir(source)
+        if keep is None:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def timed(samples, name, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def run_once(username, reference, samples, rng):
+    """Run every benchmarked operation once for `username`, appending timings to `samples`."""
+    from core.adherence import adherence_summary
+    from core.calendar_events import day_index_from_frame, events_from_frame
+    from core.history_query import HistoryQuery
+    from core.tracker import ExerciseMemoryTracker
+    from core.training_load import CHRONIC_DAYS, load_summary, training_load
+    from core.workout_rollup import days_in_period, rollup_aggregates
+    from core.workout_schema import editor_frame, workout_frame
+    from core.workout_store import delete_logs, load_adherence, load_rollup, read_log, read_range, upsert_logs, write_log
+
+    now = datetime.now()
+    today = now.date()
+    # The analysis page's '30d' period
+    cutoff = now - timedelta(days=30)
+
+    # History load, as the Workout Log page does it
+    memories = timed(samples, 'history_load', read_log, username)
+    df = timed(samples, 'history_frame', lambda: workout_frame(memories, parse_sets=False, username=username))
+
+    # Save Log: upsert today's entries, some replacing existing ones
+    records = [dict(record, date=today.isoformat()) for record in rng.sample(memories, EDIT_ROWS)]
+    memories = timed(samples, 'save_log_upsert', upsert_logs, username, memories, records)
+    timed(samples, 'save_log_write', write_log, username, memories, [today.isoformat()])
+
+    # Delete Selected Logs
+    keys = [(record['exercise_name'], record['date']) for record in rng.sample(memories, EDIT_ROWS)]
+    memories = timed(samples, 'bulk_delete', delete_logs, username, memories, keys)
+    timed(samples, 'bulk_delete_write', write_log, username, memories, [key[1] for key in keys])
+
+    # Save All Changes writes back the whole editor frame
+    edited = editor_frame(df).to_dict(orient='records')
+    timed(samples, 'save_all_changes', write_log, username, edited)
+
+    # Exercise memory tracker
+    tracker = ExerciseMemoryTracker(username)
+    for memory in generate_memories(EDIT_ROWS, reference, seed=rng.randrange(1 << 30)):
+        memory.pop('timestamp')
+        timed(samples, 'tracker_store', tracker.store_exercise_memory, memory)
+    timed(samples, 'tracker_query', tracker.get_exercise_memories, 30, 'chest')
+    timed(samples, 'tracker_summarize', tracker.summarize_memories, 30)
+
+    # Analysis page: rollup aggregates, training load and the first history page
+    start = (cutoff - timedelta(days=CHRONIC_DAYS)).date().isoformat()
+
+    def analysis_aggregates():
+        aggregates = rollup_aggregates(days_in_period(load_rollup(username), cutoff))
+        query = HistoryQuery(workout_frame(read_range(username, start), username=username))
+        aggregates['training_load'] = load_summary(training_load(query.df, cutoff, today), as_of=aggregates['end_date'])
+        query.page({}, 0, 50, cutoff)
+        return aggregates
+    timed(samples, 'analysis_aggregates', analysis_aggregates)
+
+    # Plan adherence, kept up to date by the writes above
+    timed(samples, 'adherence', lambda: adherence_summary(load_adherence(username), cutoff.date().isoformat()))
+
+    # Calendar: events and day index for the visible month
+    def calendar_events():
+        month_df = workout_frame(read_range(username, (today - timedelta(days=42)).isoformat(), today.isoformat()),
+                                 username=username)
+        return events_from_frame(month_df), day_index_from_frame(month_df)
+    timed(samples, 'calendar_events', calendar_events)
+
+
+def run_benchmark(rows, users, repeat=1, seed=0, keep=None):
+    """
+    Generate `users` histories of `rows` entries and time every operation
+    `repeat` times per user.
+
+    Returns:
+        dict: operation -> {'count', 'p50_ms', 'p95_ms', 'max_ms'}
+    """
+    repo = os.getcwd()
+    reference = read_reference(os.path.join(repo, 'file'))
+    rng = random.Random(seed)
+    samples = {}
+    with scratch_dir(keep):
+        usernames = write_dataset('.', users, rows, source_dir=os.path.join(repo, 'file'), seed=seed)
+        for _ in range(repeat):
+            for username in usernames:
+                run_once(username, reference, samples, rng)
+    return {
+        name: {
+            'count': len(values),
+            'p50_ms': round(percentile(sorted(values), 50), 3),
+            'p95_ms': round(percentile(sorted(values), 95), 3),
+            'max_ms': round(max(values), 3)
+        }
+        for name, values in samples.items()
+    }
+
+
+def compare(result, baseline, tolerance):
+    """
+    Operations whose p50 grew by more than `tolerance` (a fraction) over the baseline.
+
+    Returns:
+        list: (operation, baseline p50, current p50) for each regression
+    """
+    return [
+        (name, baseline[name]['p50_ms'], row['p50_ms'])
+        for name, row in result.items()
+        if name in baseline and row['p50_ms'] > baseline[name]['p50_ms'] * (1 + tolerance)
+    ]
+
+
+def print_report(result, baseline=None):
+    print(f"{'operation':<22}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}" + (f"{'base p50':>10}" if baseline else ''))
+    for name, row in result.items():
+        line = f"{name:<22}{row['count']:>7}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['max_ms']:>10.2f}"
+        if baseline and name in baseline:
+            line += f"{baseline[name]['p50_ms']:>10.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help="Log entries per user")
+    parser.add_argument('--users', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', help="Generate into this directory and keep it")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="Record this run as the baseline for its row count")
+    parser.add_argument('--compare', action='store_true', help="Fail if an operation regressed against the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed p50 slowdown as a fraction (default 0.5)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.rows, args.users, args.repeat, args.seed, args.keep)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baselines = json.load(f)
+    # Baselines are kept per row count, since most operations scale with it
+    baseline = baselines.get(str(args.rows))
+    print_report(result, baseline)
+
+    if args.save_baseline:
+        baselines[str(args.rows)] = result
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline for {args.rows} rows to {args.baseline}")
+
+    if args.compare:
+        if baseline is None:
+            parser.exit(1, f"\nNo baseline for {args.rows} rows in {args.baseline}\n")
+        regressions = compare(result, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p50 {before:.2f} ms -> {after:.2f} ms")
+        if regressions:
+            parser.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Offline stand-ins for OpenAI, API Ninjas and YouTube.
+
+Each stand-in replays responses from a recordings file (see recordings.json)
+with configurable latency and failure injection, and counts its calls, so the
+WorkoutBot pipeline can be exercised without network access or st.secrets.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+
+RECORDINGS_FILE = os.path.join(os.path.dirname(__file__), 'recordings.json')
+
+
+def load_recordings(path=RECORDINGS_FILE):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class Latency:
+    def __init__(self, mean_ms=0, jitter_ms=0, failure_rate=0.0, seed=None):
+        """
+        Injected latency and failures for one stand-in service.
+
+        Args:
+            mean_ms (float): Mean delay added to each call
+            jitter_ms (float): Uniform +/- jitter around the mean
+            failure_rate (float): Probability in [0, 1] that a call fails
+            seed (int, optional): Seed for reproducible runs
+        """
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        """
+        Sleep for the injected latency and report whether this call should fail.
+
+        Args:
+            timeout (float, optional): Client timeout in seconds. A call slower than
+            this sleeps for the timeout and raises TimeoutError, like a real client.
+        """
+        with self._lock:
+            delay = self.mean_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._random.random() < self.failure_rate
+        if timeout is not None and delay / 1000 > timeout:
+            time.sleep(max(timeout, 0))
+            raise TimeoutError(f"timed out after {timeout:.2f}s")
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+
+class CallCounter:
+    def __init__(self):
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+
+def _completion(content, tool_calls=None, tokens=0):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls, role='assistant')
+    usage = SimpleNamespace(total_tokens=tokens, prompt_tokens=0, completion_tokens=tokens)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')], usage=usage)
+
+
+def _stream(content, latency, chunk_words=4):
+    words = content.split(' ')
+    for i in range(0, len(words), chunk_words):
+        latency.wait()
+        text = ' '.join(words[i:i + chunk_words]) + ' '
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)])
+
+
+class FakeOpenAI:
+    def __init__(self, recordings, latency=None, stream_latency=None):
+        """
+        Stand-in for openai.OpenAI. Recognizes the pipeline's calls by their
+        prompts and replays the recorded reply for the latest user message.
+        Exercise extraction is passed the answer rather than the prompt, so it
+        replays the exercises of the turn whose answer that is.
+
+        Args:
+            recordings (dict): Loaded recordings.json
+            latency (Latency, optional): Delay and failures per completion
+            stream_latency (Latency, optional): Delay per streamed chunk
+        """
+        self.recordings = recordings
+        self.latency = latency or Latency()
+        self.stream_latency = stream_latency or Latency()
+        self.counter = CallCounter()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._answers = {' '.join(turn['answer'].split()): turn for turn in recordings['turns'].values()}
+
+    def create(self, model, messages, stream=False, tools=None, tool_choice=None, **kwargs):
+        system = ' '.join(m['content'] for m in messages if m['role'] == 'system')
+        if 'ONLY Assign one or more muscles groups' in system:
+            kind = 'extract_muscle_group'
+        elif 'extract the exercises' in system:
+            kind = 'extract_exercises'
+        elif tools:
+            kind = 'tool_choice'
+        elif stream:
+            kind = 'stream'
+        else:
+            kind = 'recommendation'
+        self.counter.count(kind)
+        if self.latency.wait(kwargs.get('timeout')):
+            raise TimeoutError(f"injected OpenAI failure ({kind})")
+
+        user_text = [m['content'] for m in messages if m['role'] == 'user'][-1]
+        if kind == 'extract_exercises':
+            return _completion(', '.join(self._answer_exercises(user_text)), tokens=40)
+        turn = self._turn(user_text)
+        if kind == 'extract_muscle_group':
+            return _completion(' '.join(turn['muscles']), tokens=20)
+        if kind == 'tool_choice':
+            tool_calls = None
+            if turn.get('wants_tips'):
+                function = SimpleNamespace(name='get_tips', arguments='{}')
+                tool_calls = [SimpleNamespace(id='call_replay', type='function', function=function)]
+            return _completion(None, tool_calls=tool_calls, tokens=60)
+        if kind == 'recommendation':
+            return _completion(turn['answer'], tokens=300)
+        return _stream(turn['answer'], self.stream_latency)
+
+    def _answer_exercises(self, answer):
+        """
+        Exercises named in an answer: the recorded ones if it is a recorded answer,
+        otherwise every recorded exercise name it mentions, in order of appearance
+        (e.g. an answer cut off at the turn deadline).
+        """
+        turn = self._answers.get(' '.join(answer.split()))
+        if turn is not None:
+            return turn['exercises']
+        text = answer.lower()
+        names = {ex['name'].lower() for exercises in self.recordings['exercises'].values() for ex in exercises}
+        names.update(name for turn in self.recordings['turns'].values() for name in turn['exercises'])
+        return sorted((name for name in names if name in text), key=text.find)
+
+    def _turn(self, user_text):
+        turns = self.recordings['turns']
+        if user_text in turns:
+            return turns[user_text]
+        # Unrecorded prompt: pick muscles mentioned in the text and recommend the
+        # recorded exercises for them.
+        muscles = [m for m in self.recordings['exercises'] if m.replace('_', ' ') in user_text.lower()]
+        muscles = muscles or ['chest']
+        exercises = [ex['name'].lower() for m in muscles for ex in self.recordings['exercises'][m][:3]]
+        answer = "Try these exercises: " + ', '.join(exercises) + "."
+        return {'muscles': muscles, 'exercises': exercises, 'answer': answer}
+
+
+class _NinjasResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=None)
+
+    def json(self):
+        return self.payload
+
+
+class FakeNinjas:
+    def __init__(self, recordings, latency=None):
+        """Stand-in for the requests module as used against API Ninjas."""
+        self.recordings = recordings
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.counter.count('get')
+        try:
+            failed = self.latency.wait(timeout)
+        except TimeoutError as e:
+            raise requests.exceptions.Timeout(str(e))
+        if failed:
+            raise requests.exceptions.ConnectionError("injected API Ninjas failure")
+        params = params or {}
+        exercises = self.recordings['exercises'].get(params.get('muscle', ''), [])
+        if params.get('difficulty'):
+            matching = [ex for ex in exercises if ex['difficulty'] == params['difficulty']]
+            exercises = matching or exercises
+        return _NinjasResponse(exercises)
+
+
+class _YouTubeRequest:
+    def __init__(self, youtube, query):
+        self.youtube = youtube
+        self.query = query
+
+    def execute(self, **kwargs):
+        self.youtube.counter.count('execute')
+        if self.youtube.latency.wait():
+            raise ConnectionError("injected YouTube failure")
+        key = re.sub(r'\s+form$', '', self.query.lower())
+        video_id = self.youtube.recordings['videos'].get(key, 'dQw4w9WgXcQ')
+        item = {
+            'id': {'videoId': video_id},
+            'snippet': {
+                'title': f"How to do {key} with proper form",
+                'description': f"Form tutorial for {key}.",
+                'thumbnails': {'default': {'url': f"https://i.ytimg.com/vi/{video_id}/default.jpg"}}
+            }
+        }
+        return {'items': [item]}
+
+
+class FakeYouTube:
+    def __init__(self, recordings, latency=None):
+        """Stand-in for googleapiclient's YouTube v3 resource (search().list().execute())."""
+        self.recordings = recordings
+        self.latency = latency or Latency()
+        self.counter = CallCounter()
+
+    def search(self):
+        return self
+
+    def list(self, q='', **kwargs):
+        self.counter.count('list')
+        return _YouTubeRequest(self, q)
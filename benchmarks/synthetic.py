@@ -0,0 +1,159 @@
+"""
+Synthetic workout histories for the storage and analysis benchmarks.
+
+Histories use the muscles in file/muscle_list.csv, equipment from
+file/workout_equipments.csv and the recorded API Ninjas exercises, so they look
+like what the app writes: a few exercises on most days, mostly sets like
+"135/8", some bodyweight "bw/12" sets and the odd empty or "NA" entry.
+
+    python -m benchmarks.synthetic --rows 100000 --users 5 --out /tmp/workout-data
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+from datetime import date, datetime, timedelta
+
+from core.reference_data import DIFFICULTIES, WORKOUT_TYPES, reference_data
+from benchmarks.replay import load_recordings
+
+# Reference files copied into every generated data directory
+REFERENCE_FILES = ('muscle_list.csv', 'workout_equipments.csv')
+
+
+def read_reference(source_dir='file'):
+    """
+    Muscles, equipment and an exercise catalogue per muscle.
+
+    Returns:
+        tuple: (muscles, equipment names, {muscle: [exercise names]})
+    """
+    reference = reference_data(*(os.path.join(source_dir, name) for name in REFERENCE_FILES))
+    muscles, equipment = list(reference.muscles), list(reference.equipment)
+
+    catalogue = {muscle: [] for muscle in muscles}
+    for muscle, exercises in load_recordings()['exercises'].items():
+        catalogue.setdefault(muscle, []).extend(exercise['name'].lower() for exercise in exercises)
+    for muscle, names in catalogue.items():
+        # Muscles without recorded exercises get a few equipment-based ones
+        if not names:
+            names.extend(f"{name.lower()} {muscle.replace('_', ' ')} {movement}"
+                         for name, movement in zip(equipment[::9], ('press', 'row', 'raise', 'curl', 'extension')))
+    return muscles, equipment, catalogue
+
+
+def random_set(rng, weight):
+    roll = rng.random()
+    if roll < 0.05:
+        return ''
+    if roll < 0.08:
+        return 'NA'
+    if roll < 0.2:
+        return f"bw/{rng.randint(8, 20)}"
+    return f"{weight}/{rng.randint(3, 12)}"
+
+
+def generate_history(username, rows, reference, end=None, exercises_per_day=6, seed=0):
+    """
+    Generate a workout log of `rows` entries ending at `end`.
+
+    Args:
+        username (str): Owner written into every entry
+        rows (int): Number of log entries
+        reference (tuple): Output of read_reference()
+        end (date, optional): Date of the newest entries; today if omitted
+        exercises_per_day (int): Mean exercises logged on a training day
+        seed (int): Seed for reproducible histories
+
+    Returns:
+        list: Log entries, oldest first, in the workout_log_hist format
+    """
+    rng = random.Random(seed)
+    muscles, equipment, catalogue = reference
+    day = end or date.today()
+    # Training days are laid out back from `end`, then weights walked forward
+    # from the oldest so they drift upwards over the history
+    sessions = []
+    while sum(len(names) for _, _, names in sessions) < rows:
+        for muscle in rng.sample(muscles, 2):
+            names = rng.sample(catalogue[muscle], min(len(catalogue[muscle]), exercises_per_day // 2))
+            sessions.append((day, muscle, names))
+        day -= timedelta(days=1 if rng.random() < 0.7 else 2)
+
+    base_weights = {}
+    memories = []
+    for day, muscle, names in reversed(sessions):
+        for name in names:
+            # In 5 lb steps
+            weight = base_weights.get(name, rng.randrange(20, 200, 5)) + rng.choice((0, 0, 0, 5))
+            base_weights[name] = weight
+            memories.append({
+                "username": username,
+                "date": day.isoformat(),
+                "exercise_name": name,
+                "muscle_group": muscle,
+                "workout_type": rng.choice(WORKOUT_TYPES[3:5] if rng.random() < 0.8 else WORKOUT_TYPES),
+                "difficulty": rng.choice(DIFFICULTIES),
+                "equipment_used": rng.choice(equipment),
+                "lbs/bw_reps for first set": random_set(rng, weight),
+                "lbs/bw_reps for second set": random_set(rng, weight),
+                "lbs/bw_reps for third set": random_set(rng, weight)
+            })
+    memories = memories[len(memories) - rows:]
+    return memories
+
+
+def generate_memories(rows, reference, seed=0):
+    """Exercise memory entries in the ExerciseMemoryTracker format, newest last."""
+    rng = random.Random(seed)
+    muscles, _, catalogue = reference
+    start = datetime.now() - timedelta(days=rows // 6 + 1)
+    memories = []
+    for i in range(rows):
+        muscle = rng.choice(muscles)
+        memories.append({
+            'muscle_group': muscle,
+            'exercise_name': rng.choice(catalogue[muscle]),
+            'difficulty': rng.choice(DIFFICULTIES),
+            'workout_type': rng.choice(WORKOUT_TYPES),
+            'timestamp': (start + timedelta(hours=4 * i)).isoformat()
+        })
+    return memories
+
+
+def write_dataset(out_dir, users, rows, source_dir='file', seed=0):
+    """
+    Write a self-contained data directory: out_dir/file/ with the reference CSVs
+    plus a workout log and an exercise memory file per user.
+
+    Returns:
+        list: Generated usernames
+    """
+    file_dir = os.path.join(out_dir, 'file')
+    os.makedirs(file_dir, exist_ok=True)
+    for name in REFERENCE_FILES:
+        shutil.copy(os.path.join(source_dir, name), os.path.join(file_dir, name))
+    reference = read_reference(source_dir)
+    usernames = [f"synthetic_{i}" for i in range(users)]
+    for i, username in enumerate(usernames):
+        with open(os.path.join(file_dir, f"workout_log_hist_{username}.json"), 'w') as f:
+            json.dump(generate_history(username, rows, reference, seed=seed + i), f)
+        with open(os.path.join(file_dir, f"exercise_memory_{username}.json"), 'w') as f:
+            json.dump(generate_memories(min(rows, 5000), reference, seed=seed + i), f)
+    return usernames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000, help="Log entries per user")
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--out', required=True, help="Directory to write file/ into")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    usernames = write_dataset(args.out, args.users, args.rows, seed=args.seed)
+    print(f"Wrote {len(usernames)} users x {args.rows} rows to {os.path.join(args.out, 'file')}")
+
+
+if __name__ == '__main__':
+    main()
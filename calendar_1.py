@@ -1,184 +1,167 @@
 import streamlit as st
 import streamlit_calendar as stc
-from workout import ExerciseMemoryTracker
 import pandas as pd
 from datetime import datetime, timedelta
-import streamlit.components.v1 as components
-import json
+from core.workout_schema import workout_frame
+from core.calendar_events import day_index_from_frame, events_from_frame
+from core.workout_store import load_recency, log_path, read_range
+from core.muscle_recency import RECENT_DAYS, neglected_muscles, recent_count, resting_muscles
+from core.profiling import section
+import os
+
+def month_start(day):
+    """First day of the month `day` falls in."""
+    return day.replace(day=1)
+
+def shift_month(day, months):
+    """First day of the month `months` after the month of `day`."""
+    month_index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+
+def month_range(month):
+    """
+    Dates a month grid can show: the month padded by a week on either side.
 
-def render_fullcalendar(events):
+    Returns:
+        tuple: (start, end) as 'YYYY-MM-DD'
     """
-    Renders a FullCalendar calendar inside the Streamlit app using a custom HTML+JS component.
-    
+    start = month - timedelta(days=7)
+    end = shift_month(month, 1) + timedelta(days=6)
+    return start.isoformat(), end.isoformat()
+
+@st.cache_data(max_entries=64)
+def load_calendar_events(username, start, end, mtime):
+    """
+    Events and the per-date index for the visible date range only, once per
+    (user, range, log version).
+
     Args:
-    events: A list of event data (date, title, and description for muscle group).
+        username (str): Owner of the log
+        start (str): First visible 'YYYY-MM-DD' date
+        end (str): Last visible 'YYYY-MM-DD' date
+        mtime (float): Modification time of the log file, so a saved log is re-read
     """
-    # Convert events to a JSON-like string format for embedding
-    events_json = str(events).replace("'", '"')  # Use double quotes for JSON compatibility
-
-    # HTML and JavaScript code to render FullCalendar
-    html = f"""
-    <html>
-        <head>
-            <!-- FullCalendar CSS -->
-            <link href="https://cdn.jsdelivr.net/npm/fullcalendar@3.2.0/dist/fullcalendar.min.css" rel="stylesheet">
-            <style>
-                .fc-event {{
-                    background-color: #007bff;
-                    color: white;
-                    border: none;
-                }}
-                .fc-daygrid-event {{
-                    cursor: pointer;
-                }}
-                #calendar {{
-                    max-width: 900px;
-                    margin: 0 auto;
-                    height: 600px;
-                    background-color: #f5f5f5;  /* Added background color to identify calendar space */
-                }}
-            </style>
-        </head>
-        <body>
-            <div id="calendar"></div>
-
-            <!-- FullCalendar JS -->
-            <script src="https://cdn.jsdelivr.net/npm/moment@2.24.0/moment.min.js"></script>
-            <script src="https://cdn.jsdelivr.net/npm/fullcalendar@3.2.0/dist/fullcalendar.min.js"></script>
-
-            <script>
-                // Debugging: Log event data to check if it's loaded correctly
-                console.log("Events Data:", {events_json});
-                
-                // Prepare events data to be rendered
-                var events = {events_json};
-
-                // Initialize FullCalendar after a small delay to ensure the page is fully loaded
-                setTimeout(function() {{
-                    $('#calendar').fullCalendar({{
-                        events: events,
-                        eventClick: function(calEvent, jsEvent, view) {{
-                            alert('Event: ' + calEvent.title + '\\nMuscle Groups: ' + calEvent.description);
-                        }},
-                        eventRender: function(event, element) {{
-                            console.log('Rendered event:', event);
-                        }},
-                        dayClick: function(date, jsEvent, view) {{
-                            console.log('Date clicked:', date.format());
-                        }},
-                        viewRender: function(view, element) {{
-                            console.log('Calendar view rendered:', view);
-                        }}
-                    }});
-                }}, 500);  // Delay initialization by 500 milliseconds
-            </script>
-        </body>
-    </html>
+    df = workout_frame(read_range(username, start, end), parse_sets=False, username=username)
+    if df is None:
+        return [], {}
+    return events_from_frame(df), day_index_from_frame(df)
+
+def visible_range(calendar_state, month):
     """
-    
-    # Render the HTML and JS code using Streamlit's custom component API
-    components.html(html, height=700)
-
-def get_exercise_memories(days=None, muscle_group=None, workout_type=None):
-        """
-        Retrieve exercise memories with optional filtering.
-        
-        Args:
-            days (int, optional): Number of recent days to retrieve memories from
-            muscle_group (str, optional): Filter by specific muscle group
-            workout_type (str, optional): Filter by specific workout type
-        
-        Returns:
-            list: Filtered list of exercise memories
-        """
-        with open(f"file/workout_log_hist_{st.session_state.username[0]}.json", 'r') as f:
-            memories = json.load(f)
-        
-        filtered_memories = memories
-        
-        if days:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            filtered_memories = [
-                memory for memory in filtered_memories 
-                if datetime.fromisoformat(memory['date']) >= cutoff_date
-            ]
-        
-        if muscle_group:
-            filtered_memories = [
-                memory for memory in filtered_memories
-                if memory.get('muscle_group', '').lower() == muscle_group.lower()
-            ]
-        
-        if workout_type:
-            filtered_memories = [
-                memory for memory in filtered_memories
-                if memory.get('workout_type', '').lower() == workout_type.lower()
-            ]
-        
-        return filtered_memories
-
-def load_exercise_data():
-    """Load and process exercise memory data"""
-    user_id = "default_user"  # We can expand this when we implement user authentication
-    #memory_tracker = ExerciseMemoryTracker(user_id)
-    
-    memories = get_exercise_memories(days=30)
-    if not memories:
-        st.warning("No exercise data found. Start working out to see analysis!")
+    Date range the calendar shows. FullCalendar reports its exact grid through
+    the datesSet callback when the installed streamlit_calendar forwards it;
+    until then the padded month is used.
+    """
+    if isinstance(calendar_state, dict) and calendar_state.get('callback') == 'datesSet':
+        dates = calendar_state['datesSet']
+        visible = (dates['start'][:10], (pd.Timestamp(dates['end'][:10]) - timedelta(days=1)).date().isoformat())
+        if visible[0] <= month.isoformat() <= visible[1]:
+            st.session_state.calendar_range = visible
+    calendar_range = st.session_state.get('calendar_range')
+    if calendar_range is None or not calendar_range[0] <= month.isoformat() <= calendar_range[1]:
+        calendar_range = month_range(month)
+    return calendar_range
+
+def selected_day(calendar_state):
+    """'YYYY-MM-DD' of the clicked date or event, or None."""
+    if not isinstance(calendar_state, dict):
         return None
+    if calendar_state.get('callback') == 'dateClick':
+        return calendar_state['dateClick']['date'][:10]
+    if calendar_state.get('callback') == 'eventClick':
+        return calendar_state['eventClick']['event']['start'][:10]
+    return None
+
+def on_date_select(selected_date, day_index):
+    """Handle date selection and display what was trained that day"""
+    day = day_index.get(selected_date)
+    st.subheader(f"Workouts on {selected_date}")
     
-    df = pd.DataFrame(memories)
-    #df['timestamp'] = pd.to_datetime(df['date'])
-    #df['date'] = df['date'].dt.date
-    return df
-
-def on_date_select(selected_date):
-    """Handle date selection and display the muscle group worked on that day"""
-    selected_events = [event for event in events if event['date'] == selected_date]
-    
-    if selected_events:
-        muscle_groups = ', '.join([event['muscle_group'] for event in selected_events])
-        st.write(f"Muscle groups worked on {selected_date}: {muscle_groups}")
+    if day:
+        st.write(f"Muscle groups worked: {', '.join(day['muscle_groups'])}")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    'Exercise': exercise['exercise_name'],
+                    'Muscle Group': exercise['muscle_group'],
+                    'First Set': exercise['sets'][0],
+                    'Second Set': exercise['sets'][1],
+                    'Third Set': exercise['sets'][2]
+                }
+                for exercise in day['exercises']
+            ]),
+            hide_index=True
+        )
     else:
         st.write("No exercises recorded for this day.")
 
-def generate_workout_insights(df):
-    if df is None or df.empty:
+def generate_workout_insights(index):
+    if index is None:
         return "No data available for analysis."
 
     insights = []
-    recent_workouts = df.groupby("muscle_group").size().sort_values(ascending = False)
-    if not recent_workouts.empty:
-        most_frequent = recent_workouts.idxmax()
+    recent_workouts = {muscle: recent_count(entry, RECENT_DAYS) for muscle, entry in index['muscles'].items()}
+    most_frequent = max(recent_workouts, key=recent_workouts.get, default=None)
+    if most_frequent and recent_workouts[most_frequent]:
         insights.append(f"💪 You've focused the most on your {most_frequent} recently. \n")
 
-    muscle_groups = df['muscle_group'].unique()
-    all_muscle_groups = ["Biceps", "Triceps", "Legs", "Back", "Chest", "Shoulders", "Abs"]
-    missing_groups = set(all_muscle_groups) - set(muscle_groups)
-    if missing_groups:
-        insights.append(f"🤔 Consider working on these neglected muscle groups: {', '.join(missing_groups)}.\n")
+    resting = resting_muscles(index)
+    if resting:
+        insights.append(f"😴 You trained your {', '.join(resting)} in the last day. Give them a rest today.\n")
+
+    neglected = neglected_muscles(index)
+    if neglected:
+        insights.append(f"🤔 Consider working on these neglected muscle groups: {', '.join(neglected)}.\n")
     insights.append("🚀 Tip: Consistency is key! Keep balancing your routine for overall strength.")
     return "\n".join(insights)
 
 if 'username' in st.session_state:
     st.title("View your workouts in a calendar")
 
-    df = load_exercise_data()
-
-    if df is not None:
-        grouped = df.groupby(['date', 'muscle_group']).size().reset_index(name='count')
-        events = []
-        for _, row in grouped.iterrows():
-            events.append({
-                'title': row['muscle_group'],
-                'start': row['date'], #.strftime('%Y-%m-%d')
-                'description': f"{row['muscle_group']}" 
-            })
-
-        selected_date = stc.calendar(events=events, callbacks="dateClick")
-
-        st.write("📊 **Workout Insights**")
-        insights = generate_workout_insights(df)
-        st.write(insights)
+    if 'calendar_month' not in st.session_state:
+        st.session_state.calendar_month = month_start(datetime.now().date())
+
+    col1, col2, col3 = st.columns([1, 3, 1])
+    with col1:
+        if st.button("◀ Previous"):
+            st.session_state.calendar_month = shift_month(st.session_state.calendar_month, -1)
+    with col3:
+        if st.button("Next ▶"):
+            st.session_state.calendar_month = shift_month(st.session_state.calendar_month, 1)
+    month = st.session_state.calendar_month
+    with col2:
+        st.subheader(month.strftime('%B %Y'))
+
+    username = st.session_state.username[0]
+    calendar_key = f"calendar_{month.isoformat()}"
+    start, end = visible_range(st.session_state.get(calendar_key), month)
+    with section('load'):
+        try:
+            events, day_index = load_calendar_events(username, start, end, os.path.getmtime(log_path(username)))
+        except FileNotFoundError:
+            events, day_index = [], {}
+
+    with section('render'):
+        selected_date = stc.calendar(
+            events=events,
+            options={
+                'initialView': 'dayGridMonth',
+                'initialDate': month.isoformat(),
+                # Clicked dates come back as UTC ISO strings; a UTC calendar keeps the day intact
+                'timeZone': 'UTC',
+                'headerToolbar': {'left': '', 'center': '', 'right': ''}
+            },
+            callbacks=["dateClick", "eventClick", "datesSet"],
+            key=calendar_key
+        )
+
+    clicked_day = selected_day(selected_date)
+    if clicked_day:
+        on_date_select(clicked_day, day_index)
+
+    st.write("📊 **Workout Insights**")
+    with section('aggregate'):
+        insights = generate_workout_insights(load_recency(username))
+    st.write(insights)
 else:
     st.warning("Login to view your calendar")
\ No newline at end of file
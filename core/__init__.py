@@ -0,0 +1,7 @@
+"""
+Workout tracking, storage and analytics shared by the Streamlit pages.
+
+Nothing in this package imports Streamlit, and heavy SDKs (OpenAI, the Google API
+client, pyarrow) are only imported where they are first used, so pages and tools
+can import it without side effects.
+"""
@@ -0,0 +1,217 @@
+import json
+import os
+from bisect import bisect_left
+from datetime import date, timedelta
+
+from core.exercise_names import exercise_names
+
+# A planned exercise counts as done if it is logged on the planned day or up to
+# this many days after it
+ADHERENCE_DAYS = 3
+
+
+def adherence_path(username):
+    return f"file/adherence_{username}.json"
+
+
+def plan_day(memory):
+    """'YYYY-MM-DD' a WorkoutBot plan was made on, from its timestamp."""
+    return str(memory.get('timestamp', ''))[:10]
+
+
+def window_end(day, window=ADHERENCE_DAYS):
+    return (date.fromisoformat(day) + timedelta(days=window)).isoformat()
+
+
+def logged_index(memories):
+    """
+    Build side of the join: canonical exercise name -> sorted dates it was logged on.
+
+    Args:
+        memories (list): Workout log entries, exercise names already canonical
+    """
+    logged = {}
+    for memory in memories:
+        name, day = memory.get('exercise_name'), str(memory.get('date', ''))[:10]
+        if name and day:
+            logged.setdefault(name, set()).add(day)
+    return {name: sorted(days) for name, days in logged.items()}
+
+
+def plan_entries(plans, names):
+    """
+    Probe side of the join: one entry per exercise per planned day.
+
+    Args:
+        plans (list): Exercise memories as stored by ExerciseMemoryTracker
+        names (ExerciseNames): The owner's exercise name dictionary
+
+    Returns:
+        dict: 'YYYY-MM-DD|canonical name' -> {'exercise_name', 'muscle_group', 'date', 'done'}
+    """
+    entries = {}
+    for plan in plans:
+        name, day = names.canonical(plan.get('exercise_name')), plan_day(plan)
+        if name and day:
+            entries.setdefault(f"{day}|{name}", {
+                'exercise_name': name,
+                'muscle_group': plan.get('muscle_group', 'Unknown'),
+                'date': day,
+                'done': False
+            })
+    return entries
+
+
+def probe(logged, plan, window=ADHERENCE_DAYS):
+    """Whether the plan's exercise was logged within its window."""
+    days = logged.get(plan['exercise_name'])
+    if not days:
+        return False
+    i = bisect_left(days, plan['date'])
+    return i < len(days) and days[i] <= window_end(plan['date'], window)
+
+
+def build_adherence(memories, plans, names, log_mtime=None, plan_mtime=None):
+    """Join a complete workout log with the complete exercise memory."""
+    index = {
+        'log_mtime': log_mtime,
+        'plan_mtime': plan_mtime,
+        'logged': logged_index(memories),
+        'plans': plan_entries(plans, names)
+    }
+    probe_all(index)
+    return index
+
+
+def probe_all(index, plans=None):
+    for plan in (index['plans'].values() if plans is None else plans):
+        plan['done'] = probe(index['logged'], plan)
+
+
+def update_adherence_logs(username, memories, changed_dates=None, source_mtime=None, previous_mtime=None):
+    """
+    Bring a stored adherence index in line with a freshly written workout log.
+
+    Only the changed days are re-indexed and only plans whose window covers one
+    of them are probed again. Without a stored index nothing is done; it is
+    built on the next load_adherence.
+
+    Args:
+        username (str): Owner of the log
+        memories (list): The complete log as written, exercise names canonical
+        changed_dates (iterable, optional): 'YYYY-MM-DD' dates touched by the write.
+        The log side is rebuilt if omitted.
+        source_mtime (float, optional): Modification time of the written log file
+        previous_mtime (float, optional): Modification time of the log before the write
+    """
+    index = read_adherence(username)
+    if index is None:
+        return None
+    if changed_dates is None or index.get('log_mtime') != previous_mtime:
+        index['logged'] = logged_index(memories)
+        probe_all(index)
+    else:
+        changed = {str(day)[:10] for day in changed_dates}
+        logged = index['logged']
+        for name in list(logged):
+            days = [day for day in logged[name] if day not in changed]
+            if days:
+                logged[name] = days
+            else:
+                del logged[name]
+        for name, days in logged_index(m for m in memories if str(m.get('date', ''))[:10] in changed).items():
+            logged[name] = sorted(set(logged.get(name, ())) | set(days))
+        first, last = min(changed), max(changed)
+        probe_all(index, [
+            plan for plan in index['plans'].values()
+            if plan['date'] <= last and window_end(plan['date']) >= first
+        ])
+    index['log_mtime'] = source_mtime
+    write_adherence(username, index)
+    return index
+
+
+def update_adherence_plans(username, plans, plan_mtime=None, previous_mtime=None):
+    """
+    Add newly stored WorkoutBot plans to a stored adherence index and probe them.
+
+    Without a stored index, or if the exercise memory changed behind its back,
+    nothing is done; the index is rebuilt on the next load_adherence.
+
+    Args:
+        username (str): Owner of the exercise memory
+        plans (list): The exercise memories just stored
+        plan_mtime (float, optional): Modification time of the written memory file
+        previous_mtime (float, optional): Modification time of the memory file before the write
+    """
+    index = read_adherence(username)
+    if index is None or index.get('plan_mtime') != previous_mtime:
+        return None
+    added = [entry for key, entry in plan_entries(plans, exercise_names(username)).items() if key not in index['plans']]
+    probe_all(index, added)
+    index['plans'].update({f"{entry['date']}|{entry['exercise_name']}": entry for entry in added})
+    index['plan_mtime'] = plan_mtime
+    write_adherence(username, index)
+    return index
+
+
+def adherence_rates(plans):
+    planned = len(plans)
+    done = sum(1 for plan in plans if plan['done'])
+    return {'planned': planned, 'done': done, 'rate': done / planned if planned else None}
+
+
+def adherence_summary(index, start=None, today=None):
+    """
+    Plan-versus-actual adherence, overall, per muscle and per week.
+
+    Plans whose window is still open and that are not done yet are pending and
+    left out of the rates.
+
+    Args:
+        index (dict): Adherence index from load_adherence
+        start (str, optional): First 'YYYY-MM-DD' plan day to include
+        today (date, optional): Reference day for pending plans
+
+    Returns:
+        dict: 'planned', 'done', 'rate' and 'pending' overall, plus 'muscles' and
+        'weeks' lists with the same figures per muscle group and per week (Monday)
+    """
+    today = (today or date.today()).isoformat()
+    plans, pending = [], 0
+    for plan in index['plans'].values():
+        if start is not None and plan['date'] < start:
+            continue
+        if not plan['done'] and window_end(plan['date']) >= today:
+            pending += 1
+        else:
+            plans.append(plan)
+
+    by_muscle, by_week = {}, {}
+    for plan in plans:
+        by_muscle.setdefault(plan['muscle_group'], []).append(plan)
+        day = date.fromisoformat(plan['date'])
+        by_week.setdefault((day - timedelta(days=day.weekday())).isoformat(), []).append(plan)
+
+    summary = adherence_rates(plans)
+    summary['pending'] = pending
+    summary['muscles'] = sorted(
+        ({'muscle_group': muscle, **adherence_rates(group)} for muscle, group in by_muscle.items()),
+        key=lambda row: -row['planned']
+    )
+    summary['weeks'] = [{'week': week, **adherence_rates(group)} for week, group in sorted(by_week.items())]
+    return summary
+
+
+def read_adherence(username):
+    try:
+        with open(adherence_path(username), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_adherence(username, index):
+    os.makedirs('file', exist_ok=True)
+    with open(adherence_path(username), 'w') as f:
+        json.dump(index, f)
@@ -0,0 +1,38 @@
+import pandas as pd
+from core.workout_schema import DATE_FORMAT
+from core.workout_sets import SET_COLUMNS
+
+
+def events_from_frame(df):
+    """Calendar events, one per (date, muscle group), built column-wise."""
+    grouped = df.groupby(['date', 'muscle_group'], observed=True).size().reset_index(name='count')
+    muscle_groups = grouped['muscle_group'].astype(str)
+    return pd.DataFrame({
+        'title': muscle_groups,
+        'start': grouped['date'].dt.strftime(DATE_FORMAT),
+        'description': muscle_groups
+    }).to_dict('records')
+
+
+def day_index_from_frame(df):
+    """
+    Per-date detail for the click panel.
+
+    Returns:
+        dict: 'YYYY-MM-DD' -> {'muscle_groups': [...], 'exercises': [{'exercise_name',
+        'muscle_group', 'sets': [first, second, third]}]}
+    """
+    detail = pd.DataFrame({
+        'date': df['date'].dt.strftime(DATE_FORMAT),
+        'exercise_name': df['exercise_name'].astype(str),
+        'muscle_group': df['muscle_group'].astype(str),
+        'sets': list(zip(*(df[col].astype('object').fillna('') for col in SET_COLUMNS)))
+    })
+    day_index = {}
+    for record in detail.to_dict('records'):
+        day = day_index.setdefault(record.pop('date'), {'muscle_groups': [], 'exercises': []})
+        if record['muscle_group'] not in day['muscle_groups']:
+            day['muscle_groups'].append(record['muscle_group'])
+        record['sets'] = list(record['sets'])
+        day['exercises'].append(record)
+    return day_index
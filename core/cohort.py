@@ -0,0 +1,156 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+LOG_PATTERN = "file/workout_log_hist_*.json"
+PARTIALS_CACHE = "file/cohort_partials.json"
+
+# Partial fields that merge by summing counts per key
+COUNTER_FIELDS = ('muscle_groups', 'muscle_group_users', 'workout_types', 'weekly_entries', 'weekly_active_users')
+
+
+def week_start(day):
+    """Monday of the week a 'YYYY-MM-DD' date falls in, as 'YYYY-MM-DD'."""
+    day = date.fromisoformat(str(day)[:10])
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def user_partial(path):
+    """
+    Mergeable aggregate of one user's workout log.
+
+    Runs in a worker process, so it only uses the standard library.
+
+    Args:
+        path (str): Path of a workout_log_hist_*.json file
+
+    Returns:
+        dict: 'users' and 'entries' counts plus one {key: count} mapping per field
+        in COUNTER_FIELDS. User-count fields hold 1 per key the user appears under,
+        so summing partials counts distinct users.
+    """
+    try:
+        with open(path, 'r') as f:
+            memories = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        memories = []
+
+    muscle_groups = Counter(str(memory.get('muscle_group', 'Unknown')) for memory in memories)
+    weekly_entries = Counter()
+    for memory in memories:
+        try:
+            weekly_entries[week_start(memory.get('date', ''))] += 1
+        except ValueError:
+            continue
+    return {
+        'users': 1 if memories else 0,
+        'entries': len(memories),
+        'muscle_groups': dict(muscle_groups),
+        'muscle_group_users': dict.fromkeys(muscle_groups, 1),
+        'workout_types': dict(Counter(str(memory.get('workout_type', 'Unknown')) for memory in memories)),
+        'weekly_entries': dict(weekly_entries),
+        'weekly_active_users': dict.fromkeys(weekly_entries, 1)
+    }
+
+
+def empty_partial():
+    return {'users': 0, 'entries': 0, **{field: {} for field in COUNTER_FIELDS}}
+
+
+def merge_partials(partials):
+    """Sum partial aggregates into one cohort aggregate."""
+    merged = empty_partial()
+    counters = {field: Counter() for field in COUNTER_FIELDS}
+    for partial in partials:
+        merged['users'] += partial['users']
+        merged['entries'] += partial['entries']
+        for field in COUNTER_FIELDS:
+            counters[field].update(partial[field])
+    for field in COUNTER_FIELDS:
+        merged[field] = dict(counters[field])
+    return merged
+
+
+def read_partials(cache_path=PARTIALS_CACHE):
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_partials(partials, cache_path=PARTIALS_CACHE):
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump(partials, f)
+
+
+def aggregate_cohort(pattern=LOG_PATTERN, workers=None, cache_path=PARTIALS_CACHE):
+    """
+    Aggregate every user's workout log into cohort totals.
+
+    Partials are cached per file and reused while the file's mtime is unchanged;
+    only new or modified logs are read, in parallel across a process pool.
+
+    Args:
+        pattern (str): Glob of the user log files
+        workers (int, optional): Worker processes; defaults to the CPU count.
+        0 computes stale partials in this process.
+        cache_path (str): Where partials are cached between runs
+
+    Returns:
+        tuple: (cohort aggregate from merge_partials, {'files', 'recomputed', 'reused'})
+    """
+    cached = read_partials(cache_path)
+    mtimes = {path: os.path.getmtime(path) for path in glob.glob(pattern)}
+    stale = sorted(path for path, mtime in mtimes.items() if cached.get(path, {}).get('mtime') != mtime)
+
+    if stale and workers != 0 and len(stale) > 1:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(stale) // (workers * 4))
+        # Spawned, not forked: a fork of the Streamlit server would copy its
+        # threads' locks and sessions' memory into every worker
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            fresh = list(executor.map(user_partial, stale, chunksize=chunksize))
+    else:
+        fresh = [user_partial(path) for path in stale]
+
+    partials = {path: entry for path, entry in cached.items() if path in mtimes}
+    partials.update({path: {'mtime': mtimes[path], 'partial': partial} for path, partial in zip(stale, fresh)})
+    if stale or len(partials) != len(cached):
+        write_partials(partials, cache_path)
+
+    stats = {'files': len(mtimes), 'recomputed': len(stale), 'reused': len(mtimes) - len(stale)}
+    return merge_partials(entry['partial'] for entry in partials.values()), stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate workout logs across all users.")
+    parser.add_argument('--pattern', default=LOG_PATTERN, help="Glob of user workout log files")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (0 runs in-process)")
+    parser.add_argument('--cache', default=PARTIALS_CACHE, help="Partials cache file")
+    parser.add_argument('--json', action='store_true', help="Print the full cohort aggregate as JSON")
+    args = parser.parse_args()
+
+    cohort, stats = aggregate_cohort(args.pattern, args.workers, args.cache)
+    if args.json:
+        print(json.dumps({'stats': stats, 'cohort': cohort}, indent=2, sort_keys=True))
+        return
+
+    print(f"{stats['files']} logs ({stats['recomputed']} recomputed, {stats['reused']} cached): "
+          f"{cohort['users']} active users, {cohort['entries']} exercises logged")
+    print("Most trained muscle groups:")
+    for muscle, count in Counter(cohort['muscle_groups']).most_common(10):
+        print(f"  {muscle:<20} {count:>8} exercises  {cohort['muscle_group_users'][muscle]:>6} users")
+    print("Recent weeks:")
+    for week in sorted(cohort['weekly_entries'])[-8:]:
+        print(f"  {week}  {cohort['weekly_active_users'][week]:>6} users  {cohort['weekly_entries'][week]:>8} exercises")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Points per line in the progression chart and buckets along the x axis of the
+# daily area chart. Histories larger than this are downsampled before charting.
+LINE_POINT_BUDGET = 400
+AREA_BUCKET_BUDGET = 180
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x (ndarray): Increasing x values (numeric)
+        y (ndarray): y values, same length, no NaN
+        threshold (int): Number of points to keep
+
+    Returns:
+        ndarray: Indices of the kept points, always including the first and last
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    kept = np.empty(threshold, dtype='int64')
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Twice the triangle area between the previous kept point, each candidate
+        # and the average of the next bucket
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample_lines(df, x, y, series, budget=LINE_POINT_BUDGET):
+    """
+    Downsample each line of a long-form chart frame with LTTB.
+
+    Args:
+        df (DataFrame): Long-form data, one row per point
+        x (str): Datetime column
+        y (str): Value column; rows with NaN are dropped
+        series (str): Column naming the line each point belongs to
+        budget (int): Maximum points per line
+
+    Returns:
+        DataFrame: The kept rows
+    """
+    df = df.dropna(subset=[y])
+    parts = []
+    for _, line in df.groupby(series, sort=False):
+        line = line.sort_values(x)
+        if len(line) > budget:
+            x_values = line[x].to_numpy(dtype='datetime64[ns]').astype('int64')
+            line = line.iloc[lttb(x_values, line[y].to_numpy(), budget)]
+        parts.append(line)
+    if not parts:
+        return df
+    return pd.concat(parts, ignore_index=True)
+
+
+def choose_bucket(start, end, budget=AREA_BUCKET_BUDGET):
+    """
+    Coarsest-needed time bucket so the visible range fits the budget.
+
+    Returns:
+        str: 'D', 'W' or 'MS' (pandas frequency), or 'YS' for very long ranges
+    """
+    span_days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+    for freq, days in (('D', 1), ('W', 7), ('MS', 30.4)):
+        if span_days / days <= budget:
+            return freq
+    return 'YS'
+
+
+def bucket_counts(df, category, freq):
+    """
+    Sum daily counts into time buckets.
+
+    Args:
+        df (DataFrame): Wide daily counts, DatetimeIndex and one column per category
+        category (str): Name for the category column in the result
+        freq (str): Pandas frequency from choose_bucket
+
+    Returns:
+        DataFrame: Long form with 'date', `category` and 'count' columns
+    """
+    if freq != 'D':
+        df = df.resample(freq).sum()
+    data = df.stack().reset_index()
+    data.columns = ['date', category, 'count']
+    return data
@@ -0,0 +1,193 @@
+import csv
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+EQUIPMENT_FILE = 'file/workout_equipments.csv'
+
+# API Ninjas reports equipment with its own vocabulary ("dumbbell", "e-z_curl_bar", ...).
+# Map those tokens onto the gym catalog in workout_equipments.csv. An empty tuple means
+# the exercise needs no equipment at all.
+API_EQUIPMENT_ALIASES = {
+    'body only': (),
+    'none': (),
+    'dumbbell': ('Dumbbells',),
+    'barbell': ('Fixed Barbells', 'Power Rack', 'Smith Machine'),
+    'e z curl bar': ('Fixed EZ Barbells',),
+    'kettlebell': ('Kettlebells',),
+    'exercise ball': ('Stability Balls',),
+    'medicine ball': ('Slam Balls',),
+    'cable': ('Long Cable Pull', 'Standing Cable', 'FTS Glide'),
+}
+
+
+def normalize_equipment(name: str) -> str:
+    """
+    Normalize an equipment name so catalog entries, API Ninjas tokens and
+    free text typed by the user compare equal.
+
+    "Dumbbells", "dumbbell" and " DUMBBELL " all become "dumbbell".
+    """
+    if not name:
+        return ''
+    key = re.sub(r'[\s_\-]+', ' ', str(name).strip().lower())
+    if key.endswith('s') and not key.endswith('ss'):
+        key = key[:-1]
+    return key
+
+
+class EquipmentIndex:
+    def __init__(self, equipment_rows: Iterable[Dict]):
+        """
+        Build the equipment catalog index.
+
+        Args:
+            equipment_rows (iterable): Rows with 'Equipment Name' and 'Purpose' keys,
+            as read from workout_equipments.csv
+        """
+        self.names = {}            # normalized equipment -> display name
+        self.purposes = {}         # normalized equipment -> purpose
+        self.equipment_to_exercises = {}   # normalized equipment -> set of exercise names
+        self.exercise_to_equipment = {}    # exercise name (lower) -> set of normalized equipment
+        self.indexed_logs = {}     # log owner -> version of the log last indexed
+        # The index is shared by every session, so changes and the lookups that
+        # read the sets being changed go through this lock.
+        self._lock = threading.Lock()
+
+        for row in equipment_rows:
+            name = (row.get('Equipment Name') or '').strip()
+            if not name:
+                continue
+            key = normalize_equipment(name)
+            self.names[key] = name
+            self.purposes[key] = (row.get('Purpose') or '').strip()
+            self.equipment_to_exercises.setdefault(key, set())
+
+        self.aliases = {
+            normalize_equipment(token): tuple(normalize_equipment(name) for name in names)
+            for token, names in API_EQUIPMENT_ALIASES.items()
+        }
+
+    def resolve(self, equipment: str) -> Set[str]:
+        """
+        Resolve an equipment name or API Ninjas token to normalized catalog keys.
+        Unknown equipment resolves to its own normalized key.
+        """
+        key = normalize_equipment(equipment)
+        if key in self.aliases:
+            return set(self.aliases[key])
+        if not key:
+            return set()
+        return {key}
+
+    def add_exercise(self, exercise_name: str, equipment: str):
+        """
+        Link an exercise to the equipment it needs.
+
+        Args:
+            exercise_name (str): Exercise name, e.g. from API Ninjas or the workout log
+            equipment (str): Equipment name or API Ninjas equipment token
+        """
+        with self._lock:
+            self._add_exercise(exercise_name, equipment)
+
+    def _add_exercise(self, exercise_name: str, equipment: str):
+        if not exercise_name:
+            return
+        exercise = exercise_name.strip().lower()
+        keys = self.resolve(equipment)
+        self.exercise_to_equipment.setdefault(exercise, set()).update(keys)
+        for key in keys:
+            self.equipment_to_exercises.setdefault(key, set()).add(exercise)
+
+    def add_exercises(self, exercises: Iterable[Dict]):
+        """Index a list of API Ninjas exercise records ('name' and 'equipment' keys)."""
+        with self._lock:
+            for ex in exercises:
+                self._add_exercise(ex.get('name', ''), ex.get('equipment', ''))
+
+    def add_workout_logs(self, workout_logs: Iterable[Dict], owner: str = None, version=None):
+        """
+        Index the 'equipment_used' recorded with workout log entries.
+
+        Args:
+            workout_logs (iterable): Workout log entries
+            owner (str, optional): Whose log it is
+            version (optional): Version of the log, e.g. its mtime. A log already
+            indexed for `owner` at this version is skipped.
+        """
+        with self._lock:
+            if owner is not None:
+                if version is not None and self.indexed_logs.get(owner) == version:
+                    return
+                self.indexed_logs[owner] = version
+            for log in workout_logs or []:
+                if log.get('equipment_used'):
+                    self._add_exercise(log.get('exercise_name', ''), log['equipment_used'])
+
+    def purpose(self, equipment_name: str) -> str:
+        """Get purpose of specific equipment."""
+        return self.purposes.get(normalize_equipment(equipment_name), "Purpose not found")
+
+    def display_name(self, key: str) -> str:
+        return self.names.get(key, key)
+
+    def available_equipment(self) -> List[str]:
+        """Get list of catalog equipment display names."""
+        return list(self.names.values())
+
+    def exercises_for(self, equipment: str) -> Set[str]:
+        """Exercises known to use the given equipment."""
+        found = set()
+        with self._lock:
+            for key in self.resolve(equipment):
+                found |= self.equipment_to_exercises.get(key, set())
+        return found
+
+    def equipment_for(self, exercise_name: str) -> FrozenSet[str]:
+        """Normalized equipment keys the given exercise can be done with."""
+        with self._lock:
+            return frozenset(self.exercise_to_equipment.get(exercise_name.strip().lower(), ()))
+
+    def is_doable(self, exercise_name: str, available: Set[str]) -> bool:
+        """
+        Check whether an exercise can be done with the available equipment.
+
+        Args:
+            exercise_name (str): Exercise name
+            available (set): Normalized equipment keys the user has access to
+
+        Returns:
+            bool: False only when every option for the exercise is catalog equipment
+            the user does not have. Bodyweight and unknown equipment are kept.
+        """
+        options = self.equipment_for(exercise_name)
+        if not options:
+            return True
+        return any(key in available or key not in self.names for key in options)
+
+    def filter_exercises(self, exercises: List[Dict], available: Set[str]) -> List[Dict]:
+        """Keep the API Ninjas exercises that can be done with the available equipment."""
+        return [ex for ex in exercises if self.is_doable(ex.get('name', ''), available)]
+
+    def candidate_equipment(self, exercise_names: Iterable[str], available: Set[str] = None) -> List[str]:
+        """
+        Equipment needed by the given exercises, as display names.
+
+        Args:
+            exercise_names (iterable): Exercises that will be recommended
+            available (set, optional): Restrict to equipment the user has access to
+        """
+        keys = set()
+        for name in exercise_names:
+            keys |= self.equipment_for(name)
+        if available is not None:
+            keys = {key for key in keys if key in available or key not in self.names}
+        return sorted(self.display_name(key) for key in keys)
+
+
+def load_equipment_index(path=EQUIPMENT_FILE) -> EquipmentIndex:
+    """Load workout_equipments.csv into an EquipmentIndex."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        return EquipmentIndex(reader)
@@ -0,0 +1,205 @@
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+# Fuzzy suggestions must share this much of their trigrams (Dice coefficient) ...
+MIN_SIMILARITY = 0.6
+# ... and be within one edit per this many characters. That still pairs different
+# exercises, e.g. "incline ..." and "decline ..." are two edits apart, so fuzzy
+# matches are only offered as suggestions, never merged
+CHARS_PER_EDIT = 10
+
+
+def exercise_names_path(username):
+    return f"file/exercise_names_{username}.json"
+
+
+def _singular(token):
+    if len(token) > 2 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def exercise_key(name):
+    """
+    Normalized lookup key for an exercise name: lowercase letters and digits only,
+    each word singular. "Push-Ups", "push ups" and "pushup" all become "pushup".
+    """
+    return ''.join(_singular(token) for token in re.findall(r'[a-z0-9]+', str(name).lower()))
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 once it is known to exceed `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class ExerciseNames:
+    def __init__(self, names=(), version=None):
+        """
+        One user's dictionary of canonical exercise names with interned integer IDs.
+
+        The first spelling the user logs for an exercise becomes its canonical name.
+        Later spellings with the same normalized key ("Push-Ups", "push ups")
+        resolve to it. Spellings that are merely close get a new name of their own;
+        suggest() offers the close match instead.
+
+        Args:
+            names (iterable): Canonical names, in ID order
+            version (float, optional): Modification time of the file the names came from
+        """
+        self.version = version
+        self.names = []
+        self.name_keys = []
+        self.keys = {}
+        self.trigram_index = {}
+        self.dirty = False
+        # Raw string -> ID, so repeated spellings skip normalization entirely
+        self._resolved = {}
+        self._lock = threading.Lock()
+        for name in names:
+            self._add(name, exercise_key(name))
+        self.dirty = False
+
+    def _add(self, name, key):
+        exercise_id = len(self.names)
+        self.names.append(name)
+        self.name_keys.append(key)
+        self.keys[key] = exercise_id
+        for gram in trigrams(key):
+            self.trigram_index.setdefault(gram, []).append(exercise_id)
+        self.dirty = True
+        return exercise_id
+
+    def fuzzy_match(self, key):
+        """ID of the canonical name closest to `key`, or None if nothing is close enough."""
+        grams = trigrams(key)
+        shared = Counter(exercise_id for gram in grams for exercise_id in self.trigram_index.get(gram, ()))
+        limit = max(1, len(key) // CHARS_PER_EDIT)
+        best = None
+        for exercise_id, count in shared.most_common(10):
+            candidate = self.name_keys[exercise_id]
+            similarity = 2 * count / (len(grams) + len(trigrams(candidate)))
+            if similarity < MIN_SIMILARITY:
+                break
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit and (best is None or distance < best[0]):
+                best = (distance, exercise_id)
+        return best[1] if best else None
+
+    def suggest(self, name):
+        """
+        Canonical name of a different exercise spelled close to `name`, such as the
+        correct spelling of a typo, or None. Nothing is stored.
+        """
+        key = exercise_key(name) if isinstance(name, str) else ''
+        if not key or key in self.keys:
+            return None
+        exercise_id = self.fuzzy_match(key)
+        return None if exercise_id is None else self.names[exercise_id]
+
+    def lookup(self, name):
+        """ID of an exercise name, adding it as a new canonical name if its normalized key is new."""
+        exercise_id = self._resolved.get(name)
+        if exercise_id is not None:
+            return exercise_id
+        if not isinstance(name, str) or not name.strip():
+            return None
+        key = exercise_key(name)
+        if not key:
+            return None
+        with self._lock:
+            exercise_id = self.keys.get(key)
+            if exercise_id is None:
+                exercise_id = self._add(' '.join(name.split()), key)
+            self._resolved[name] = exercise_id
+        return exercise_id
+
+    def canonical(self, name):
+        """Canonical spelling of an exercise name; blanks and non-strings come back unchanged."""
+        exercise_id = self.lookup(name)
+        return name if exercise_id is None else self.names[exercise_id]
+
+    def canonicalize(self, records, field='exercise_name'):
+        """Replace `field` in each record with its canonical name, in place. Returns the records."""
+        seen = {}
+        for record in records:
+            if field not in record:
+                continue
+            name = record[field]
+            canonical = seen.get(name)
+            if canonical is None:
+                canonical = seen[name] = self.canonical(name)
+            record[field] = canonical
+        return records
+
+    def to_dict(self):
+        return {'names': list(self.names)}
+
+
+_dictionaries = {}
+_dictionary_lock = threading.Lock()
+
+
+def exercise_names(username):
+    """
+    A user's ExerciseNames, read once per process and re-read only when its file
+    changes on disk. Names added since the last save are kept until save_exercise_names.
+    """
+    path = exercise_names_path(username)
+    version = os.path.getmtime(path) if os.path.exists(path) else None
+    dictionary = _dictionaries.get(username)
+    if dictionary is not None and (dictionary.version == version or dictionary.dirty):
+        return dictionary
+    with _dictionary_lock:
+        dictionary = _dictionaries.get(username)
+        if dictionary is None or (dictionary.version != version and not dictionary.dirty):
+            data = {}
+            if version is not None:
+                try:
+                    with open(path, 'r') as f:
+                        data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}
+            dictionary = _dictionaries[username] = ExerciseNames(data.get('names', ()), version)
+        return dictionary
+
+
+def save_exercise_names(username):
+    """Write a user's dictionary back if names were added since it was read."""
+    dictionary = exercise_names(username)
+    if not dictionary.dirty:
+        return
+    path = exercise_names_path(username)
+    with _dictionary_lock:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(dictionary.to_dict(), f, indent=2)
+        dictionary.version = os.path.getmtime(path)
+        dictionary.dirty = False
+
+
+def canonical_exercise(name, username):
+    """Canonical spelling of an exercise name in a user's dictionary."""
+    return exercise_names(username).canonical(name)
+
+
+def exercise_id(name, username):
+    """Interned ID of an exercise name in a user's dictionary, or None for blanks."""
+    return exercise_names(username).lookup(name)
@@ -0,0 +1,143 @@
+import glob
+import importlib.util
+import os
+import tempfile
+import zipfile
+from core.workout_schema import DATE_FORMAT, workout_frame
+from core.workout_sets import PARSED_SET_COLUMNS
+from core.workout_store import log_path, read_log
+
+# Rows encoded at a time; only one chunk's worth of text is in memory at once
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def parquet_available():
+    """Whether the optional pyarrow dependency is installed."""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def export_formats():
+    """Export formats usable in this environment."""
+    return [name for name in EXPORT_FORMATS if name != 'Parquet' or parquet_available()]
+
+
+def export_columns(df):
+    """The stored log columns of a typed frame, without the parsed set columns."""
+    return df.drop(columns=PARSED_SET_COLUMNS, errors='ignore')
+
+
+def iter_csv_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Encode a frame as CSV one chunk of rows at a time.
+
+    Yields:
+        bytes: The header with the first chunk, then the following chunks
+    """
+    df = export_columns(df)
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0, date_format=DATE_FORMAT).encode('utf-8')
+
+
+def write_csv(df, f, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write a frame as CSV to a binary file object."""
+    for data in iter_csv_chunks(df, chunk_rows):
+        f.write(data)
+
+
+def write_parquet(df, f, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write a frame as Parquet to a binary file object, one row group per chunk.
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = export_columns(df)
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(f, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {'CSV': write_csv, 'Parquet': write_parquet}
+
+
+def export_file(df, export_format):
+    """
+    Write a frame to a temporary file in the given format.
+
+    Args:
+        df (DataFrame): Typed frame from workout_frame
+        export_format (str): A key of EXPORT_FORMATS
+
+    Returns:
+        str: Path of the temporary file; the caller removes it
+    """
+    extension = EXPORT_FORMATS[export_format][0]
+    with tempfile.NamedTemporaryFile('wb', suffix=f'.{extension}', delete=False) as f:
+        WRITERS[export_format](df, f)
+    return f.name
+
+
+def logged_usernames():
+    """Usernames with a workout log under file/."""
+    prefix, suffix = log_path('*').split('*')
+    return sorted(path[len(prefix):-len(suffix)] for path in glob.glob(log_path('*')))
+
+
+def export_archive(export_format, usernames=None):
+    """
+    Zip every user's workout log, one member per user.
+
+    Users are loaded and encoded one at a time, and each member is streamed into
+    the archive chunk by chunk, so memory holds at most one user's log.
+
+    Args:
+        export_format (str): A key of EXPORT_FORMATS
+        usernames (list, optional): Users to include; all logged users if omitted
+
+    Returns:
+        str: Path of the temporary zip file; the caller removes it
+    """
+    extension = EXPORT_FORMATS[export_format][0]
+    with tempfile.NamedTemporaryFile('wb', suffix='.zip', delete=False) as f:
+        archive_path = f.name
+    with zipfile.ZipFile(archive_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for username in usernames if usernames is not None else logged_usernames():
+            df = workout_frame(read_log(username), username=username)
+            if df is None:
+                continue
+            with archive.open(f'workout_log_{username}.{extension}', 'w', force_zip64=True) as member:
+                WRITERS[export_format](df, member)
+    return archive_path
+
+
+def read_export(path):
+    """Read an export file for st.download_button and remove it."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def deferred_export(export):
+    """
+    Deferred data for st.download_button: `export()` (a call to export_file or
+    export_archive) runs only when the download is clicked, on Streamlit's
+    download thread, and its file is read and removed right away. Nothing is
+    built or kept in session memory on page reruns.
+
+    Args:
+        export (callable): Writes the export and returns its path
+    """
+    return lambda: read_export(export())
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ('workout_type', 'muscle_group', 'difficulty')
+
+
+class HistoryQuery:
+    def __init__(self, df, filter_columns=FILTER_COLUMNS):
+        """
+        Date-sorted exercise history with an index per filter column.
+
+        The frame is sorted newest first once. Each filter column gets a map from
+        value to the (ascending) row positions holding it, so a filtered page is an
+        intersection of position arrays plus one slice, with no mask over the
+        full frame. A time period cutoff is a prefix of the sorted frame, found by
+        binary search.
+
+        Args:
+            df (DataFrame): Workout log with a datetime 'date' column
+            filter_columns (tuple): Columns that can be filtered on
+        """
+        order = np.argsort(df['date'].to_numpy(), kind='stable')[::-1]
+        self.df = df.iloc[order].reset_index(drop=True)
+        # Ascending copy of the dates for binary search
+        self._dates_ascending = self.df['date'].to_numpy()[::-1]
+        self.indexes = {
+            col: {value: np.asarray(positions) for value, positions in self.df.groupby(col, sort=False, observed=True).indices.items()}
+            for col in filter_columns if col in self.df.columns
+        }
+
+    def options(self, col):
+        """Sorted distinct values of a filter column."""
+        return sorted(self.indexes.get(col, {}))
+
+    def period_end(self, cutoff=None):
+        """Number of leading (newest) rows dated on or after `cutoff`."""
+        if cutoff is None:
+            return len(self.df)
+        older = np.searchsorted(self._dates_ascending, np.datetime64(pd.Timestamp(cutoff)), side='left')
+        return len(self.df) - int(older)
+
+    def positions(self, filters, cutoff=None):
+        """
+        Row positions matching every filter, newest first.
+
+        Args:
+            filters (dict): column -> value; 'All' or None means no filter
+            cutoff (datetime, optional): Only rows dated on or after this
+
+        Returns:
+            ndarray: Positions in the date-sorted frame, or None for "all rows
+            before `period_end(cutoff)`"
+        """
+        selected = [
+            self.indexes[col].get(value, np.empty(0, dtype='int64'))
+            for col, value in filters.items()
+            if value not in (None, 'All') and col in self.indexes
+        ]
+        if not selected:
+            return None
+        selected.sort(key=len)
+        positions = selected[0]
+        for other in selected[1:]:
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        end = self.period_end(cutoff)
+        return positions[:np.searchsorted(positions, end)]
+
+    def count(self, filters, cutoff=None):
+        """Number of rows matching every filter."""
+        positions = self.positions(filters, cutoff)
+        return self.period_end(cutoff) if positions is None else len(positions)
+
+    def page(self, filters, page=0, page_size=50, cutoff=None, columns=None):
+        """
+        One page of matching rows, newest first.
+
+        Args:
+            filters (dict): column -> value; 'All' or None means no filter
+            page (int): Zero-based page number
+            page_size (int): Rows per page
+            cutoff (datetime, optional): Only rows dated on or after this
+            columns (list, optional): Columns to return
+
+        Returns:
+            tuple: (DataFrame with the page's rows, total number of matching rows)
+        """
+        positions = self.positions(filters, cutoff)
+        start = page * page_size
+        if positions is None:
+            total = self.period_end(cutoff)
+            rows = self.df.iloc[start:min(start + page_size, total)]
+        else:
+            total = len(positions)
+            rows = self.df.iloc[positions[start:start + page_size]]
+        if columns is not None:
+            rows = rows[[col for col in columns if col in rows.columns]]
+        return rows, total
+
+    def matching(self, filters, cutoff=None):
+        """All matching rows, newest first."""
+        positions = self.positions(filters, cutoff)
+        if positions is None:
+            return self.df.iloc[:self.period_end(cutoff)]
+        return self.df.iloc[positions]
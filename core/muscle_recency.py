@@ -0,0 +1,107 @@
+import json
+import os
+from datetime import date, timedelta
+
+from core.reference_data import normalize_muscle, reference_data
+
+# Days of per-muscle daily counts kept in the index, enough for 7 and 28-day totals
+RECENT_DAYS = 28
+# A muscle not trained for this many days is reported as neglected
+NEGLECTED_DAYS = 14
+# A muscle trained this recently should rest
+REST_DAYS = 1
+
+
+def recency_path(username):
+    return f"file/muscle_recency_{username}.json"
+
+
+def build_recency(rollup, muscles=None, today=None):
+    """
+    Build the per-muscle recency index from a user's daily rollup.
+
+    Args:
+        rollup (dict): Daily rollup from workout_rollup
+        muscles (list, optional): Muscles to track; muscle_list.csv if omitted.
+        Logged muscle groups outside the list are tracked too.
+        today (date, optional): Reference day for the recent window
+
+    Returns:
+        dict: 'source_mtime' of the log and, per muscle, 'last_trained'
+        ('YYYY-MM-DD' or None), 'total' exercises logged and 'recent' daily counts
+        over the last RECENT_DAYS days
+    """
+    today = today or date.today()
+    window_start = (today - timedelta(days=RECENT_DAYS)).isoformat()
+    index = {muscle: {'last_trained': None, 'total': 0, 'recent': {}} for muscle in (muscles or reference_data().muscles)}
+    for day, summary in sorted(rollup['days'].items()):
+        for muscle_group, count in summary['muscle_group'].items():
+            entry = index.setdefault(normalize_muscle(muscle_group), {'last_trained': None, 'total': 0, 'recent': {}})
+            entry['last_trained'] = day
+            entry['total'] += count
+            if day >= window_start:
+                entry['recent'][day] = entry['recent'].get(day, 0) + count
+    return {'source_mtime': rollup.get('source_mtime'), 'muscles': index}
+
+
+def days_since(entry, today=None):
+    """Whole days since a muscle was last trained, or None if never."""
+    if entry['last_trained'] is None:
+        return None
+    return ((today or date.today()) - date.fromisoformat(entry['last_trained'])).days
+
+
+def recent_count(entry, days, today=None):
+    """Exercises logged for a muscle in the last `days` days (at most RECENT_DAYS)."""
+    start = ((today or date.today()) - timedelta(days=days)).isoformat()
+    return sum(count for day, count in entry['recent'].items() if day >= start)
+
+
+def neglected_muscles(index, today=None, threshold=NEGLECTED_DAYS):
+    """Muscles not trained in `threshold` days, never-trained first, then longest ago."""
+    stale = [
+        (muscle, days_since(entry, today)) for muscle, entry in index['muscles'].items()
+        if entry['last_trained'] is None or days_since(entry, today) >= threshold
+    ]
+    return [muscle for muscle, _ in sorted(stale, key=lambda item: -1 if item[1] is None else -item[1])]
+
+
+def resting_muscles(index, today=None, within=REST_DAYS):
+    """Muscles trained within the last `within` days, which should rest today."""
+    return [
+        muscle for muscle, entry in index['muscles'].items()
+        if entry['last_trained'] is not None and 0 <= days_since(entry, today) <= within
+    ]
+
+
+def recency_summary(index, today=None):
+    """
+    JSON-ready recency figures for the WorkoutBot prompt.
+
+    Returns:
+        dict: Days since each trained muscle was last worked, its 7 and 28-day
+        counts, and the never-trained, neglected and resting muscles
+    """
+    trained = {muscle: entry for muscle, entry in index['muscles'].items() if entry['last_trained'] is not None}
+    return {
+        'days_since_trained': {muscle: days_since(entry, today) for muscle, entry in trained.items()},
+        'last_7_days': {muscle: recent_count(entry, 7, today) for muscle, entry in trained.items()},
+        'last_28_days': {muscle: recent_count(entry, RECENT_DAYS, today) for muscle, entry in trained.items()},
+        'never_trained': [muscle for muscle, entry in index['muscles'].items() if entry['last_trained'] is None],
+        'neglected': neglected_muscles(index, today),
+        'resting': resting_muscles(index, today)
+    }
+
+
+def read_recency(username):
+    try:
+        with open(recency_path(username), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_recency(username, index):
+    os.makedirs('file', exist_ok=True)
+    with open(recency_path(username), 'w') as f:
+        json.dump(index, f)
@@ -0,0 +1,173 @@
+import cProfile
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from core.tracing import Tracer
+
+PROFILE_ENV = 'WORKOUT_PROFILE'
+SLOW_MS_ENV = 'WORKOUT_PROFILE_SLOW_MS'
+DIR_ENV = 'WORKOUT_PROFILE_DIR'
+DEFAULT_SLOW_MS = 500
+DEFAULT_DIR = 'file/profiles'
+# Newest cProfile dumps kept in the profile directory
+MAX_PROFILES = 20
+# The rerun log rolls over to reruns.jsonl.1 past this size
+MAX_LOG_BYTES = 1_000_000
+
+_current = threading.local()
+
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class Rerun:
+    def __init__(self, page):
+        """
+        Timings for one rerun of a page.
+
+        Args:
+            page (str): Page the rerun executed
+        """
+        self.page = page
+        self.started_at = datetime.now().isoformat()
+        self.duration_ms = None
+        self.sections = {}
+        self.profile_path = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            'page': self.page,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'sections': self.sections,
+            'profile': self.profile_path,
+            'error': self.error
+        }
+
+
+class RerunProfiler:
+    def __init__(self, directory=None, slow_ms=None, max_profiles=MAX_PROFILES):
+        """
+        Time page reruns and their named sections, and keep cProfile stats of slow ones.
+
+        cProfile roughly doubles the cost of a rerun, so it only runs on a page
+        whose previous rerun was slow; its stats are kept if that rerun is slow too.
+
+        Args:
+            directory (str, optional): Where rerun logs and profiles are written;
+            WORKOUT_PROFILE_DIR or file/profiles by default
+            slow_ms (float, optional): Reruns at least this long count as slow;
+            WORKOUT_PROFILE_SLOW_MS or 500 by default
+            max_profiles (int): Profile dumps kept; older ones are deleted first
+        """
+        self.directory = directory or os.environ.get(DIR_ENV, DEFAULT_DIR)
+        self.slow_ms = float(slow_ms if slow_ms is not None else os.environ.get(SLOW_MS_ENV, DEFAULT_SLOW_MS))
+        self.max_profiles = max_profiles
+        self.tracer = Tracer()
+        self._armed = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def run(self, page, fn):
+        """
+        Run `fn` (a page's rerun) as `page`, timing it and any sections it opens.
+        Exceptions, including Streamlit's rerun and stop signals, are recorded and re-raised.
+        """
+        rerun = Rerun(page)
+        with self._lock:
+            profile = page in self._armed
+        profiler = cProfile.Profile() if profile else None
+        _current.rerun = rerun
+        start = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            with self.tracer.span(f"{page}:rerun"):
+                return fn()
+        except BaseException as e:
+            rerun.error = type(e).__name__
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            rerun.duration_ms = (time.perf_counter() - start) * 1000
+            _current.rerun = None
+            slow = rerun.duration_ms >= self.slow_ms
+            with self._lock:
+                if slow:
+                    self._armed.add(page)
+                else:
+                    self._armed.discard(page)
+            if profiler and slow:
+                rerun.profile_path = self.dump_profile(profiler, rerun)
+            self.log(rerun)
+
+    def dump_profile(self, profiler, rerun):
+        """Write the rerun's cProfile stats and drop the oldest dumps beyond max_profiles."""
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(self.directory, f"{stamp}_{rerun.page}.prof")
+        profiler.dump_stats(path)
+        profiles = sorted(glob.glob(os.path.join(self.directory, '*.prof')))
+        for old in profiles[:-self.max_profiles]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return path
+
+    def log(self, rerun):
+        """Append the rerun to reruns.jsonl, rolling it over once it grows past MAX_LOG_BYTES."""
+        path = os.path.join(self.directory, 'reruns.jsonl')
+        with self._lock:
+            if os.path.exists(path) and os.path.getsize(path) > MAX_LOG_BYTES:
+                os.replace(path, path + '.1')
+            with open(path, 'a') as f:
+                f.write(json.dumps(rerun.to_dict()) + "\n")
+
+    @contextmanager
+    def section(self, name):
+        rerun = getattr(_current, 'rerun', None)
+        start = time.perf_counter()
+        try:
+            with self.tracer.span(f"{rerun.page if rerun else '-'}:{name}"):
+                yield
+        finally:
+            if rerun is not None:
+                rerun.sections[name] = rerun.sections.get(name, 0) + (time.perf_counter() - start) * 1000
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler():
+    """The process-wide RerunProfiler, or None unless WORKOUT_PROFILE is set."""
+    global _profiler
+    if not profiling_enabled():
+        return None
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = RerunProfiler()
+        return _profiler
+
+
+@contextmanager
+def section(name):
+    """
+    Time the enclosed block as section `name` of the current page rerun, e.g.
+    'load', 'aggregate', 'chart_build' or 'render'. A section opened several
+    times in one rerun adds up. Does nothing unless profiling is enabled.
+    """
+    profiler = get_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
@@ -0,0 +1,97 @@
+import csv
+import os
+import threading
+
+from core.equipment_index import EQUIPMENT_FILE, normalize_equipment
+
+MUSCLE_LIST_PATH = 'file/muscle_list.csv'
+
+# API Ninjas workout types and difficulty levels, in the order the pages offer them
+WORKOUT_TYPES = ('cardio', 'olympic_weightlifting', 'plyometrics', 'powerlifting', 'strength', 'stretching', 'strongman')
+DIFFICULTIES = ('beginner', 'intermediate', 'expert')
+WORKOUT_TYPE_SET = frozenset(WORKOUT_TYPES)
+DIFFICULTY_SET = frozenset(DIFFICULTIES)
+
+
+def normalize_muscle(name):
+    return str(name).strip().lower().replace(' ', '_')
+
+
+class ReferenceData:
+    def __init__(self, muscle_rows, equipment_rows, version=None):
+        """
+        Immutable snapshot of the muscle and equipment lists.
+
+        Args:
+            muscle_rows (iterable): Rows with a 'muscle' key, as read from muscle_list.csv
+            equipment_rows (iterable): Rows with 'Equipment Name' and 'Purpose' keys,
+            as read from workout_equipments.csv
+            version (tuple, optional): File modification times the snapshot was read at
+        """
+        self.version = version
+        self.muscles = tuple(normalize_muscle(row['muscle']) for row in muscle_rows if row.get('muscle'))
+        self.muscle_set = frozenset(self.muscles)
+        self.equipment_rows = tuple(
+            {'Equipment Name': row['Equipment Name'].strip(), 'Purpose': (row.get('Purpose') or '').strip()}
+            for row in equipment_rows if (row.get('Equipment Name') or '').strip()
+        )
+        self.equipment = tuple(row['Equipment Name'] for row in self.equipment_rows)
+        self.equipment_set = frozenset(normalize_equipment(name) for name in self.equipment)
+        self.workout_types = WORKOUT_TYPES
+        self.workout_type_set = WORKOUT_TYPE_SET
+        self.difficulties = DIFFICULTIES
+        self.difficulty_set = DIFFICULTY_SET
+
+    def invalid_fields(self, record):
+        """
+        Fields of a workout log entry holding a value outside the reference lists.
+        Equipment is optional, so an empty one passes.
+
+        Returns:
+            list: (field, value) pairs, empty if the entry is valid
+        """
+        invalid = [
+            (field, record.get(field))
+            for field, allowed in (('muscle_group', self.muscle_set),
+                                   ('workout_type', self.workout_type_set),
+                                   ('difficulty', self.difficulty_set))
+            if record.get(field) not in allowed
+        ]
+        equipment = record.get('equipment_used')
+        if isinstance(equipment, str) and equipment.strip() and normalize_equipment(equipment) not in self.equipment_set:
+            invalid.append(('equipment_used', equipment))
+        return invalid
+
+    def invalid_entries(self, records):
+        """
+        Workout log entries that would be saved with values outside the reference lists.
+
+        Returns:
+            list: (position, [(field, value), ...]) for each invalid entry
+        """
+        return [(i, fields) for i, fields in enumerate(map(self.invalid_fields, records)) if fields]
+
+
+def read_csv_rows(path):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.DictReader(f, skipinitialspace=True))
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def reference_data(muscle_path=MUSCLE_LIST_PATH, equipment_path=EQUIPMENT_FILE):
+    """
+    The current ReferenceData, read once per process and re-read only when
+    muscle_list.csv or workout_equipments.csv change on disk.
+    """
+    global _snapshot
+    version = (muscle_path, os.path.getmtime(muscle_path), equipment_path, os.path.getmtime(equipment_path))
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = ReferenceData(read_csv_rows(muscle_path), read_csv_rows(equipment_path), version)
+        return _snapshot
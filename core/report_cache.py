@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+
+# Reports kept per user; the oldest are dropped first
+MAX_REPORTS = 20
+
+
+def aggregate_fingerprint(aggregates, time_period):
+    """
+    Stable hash of exactly the data a report is generated from.
+
+    Args:
+        aggregates (dict): Date range, counts and distributions sent to the model
+        time_period (str): 'all', '30d' or '7d'
+    """
+    payload = json.dumps({'time_period': time_period, 'aggregates': aggregates}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, username):
+        """
+        Generated WorkoutBot analysis reports for one user, keyed by fingerprint.
+
+        Args:
+            username (str): Owner of the reports
+        """
+        self.cache_file = f"file/analysis_reports_{username}.json"
+
+    def get(self, fingerprint):
+        """Return the cached report for a fingerprint, or None."""
+        return self._read().get(fingerprint)
+
+    def put(self, fingerprint, report):
+        reports = self._read()
+        reports.pop(fingerprint, None)
+        reports[fingerprint] = report
+        while len(reports) > MAX_REPORTS:
+            reports.pop(next(iter(reports)))
+        os.makedirs('file', exist_ok=True)
+        with open(self.cache_file, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    def _read(self):
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# Share of the per-turn budget each stage may use. Stages running once per
+# muscle group or per exercise share their slice across those calls. The
+# shares add up to 1, so a turn whose stages all use their share still ends
+# on time.
+STAGE_SHARES = {
+    'tool_choice': 0.10,
+    'extract_muscle_group': 0.05,
+    'api_ninjas': 0.10,
+    'recommendation': 0.25,
+    'extract_exercises': 0.05,
+    'youtube': 0.10,
+    'final_stream': 0.35,
+}
+
+# Calls that cannot take a timeout themselves (YouTube's execute()) run here.
+# A call given up on keeps its worker until it returns, so at most
+# MAX_IN_FLIGHT calls may be running at once; beyond that new calls fail fast
+# instead of queueing behind abandoned ones.
+MAX_IN_FLIGHT = 8
+_executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix='deadline')
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class Deadline:
+    def __init__(self, total_seconds, shares=None, clock=time.monotonic):
+        """
+        Latency budget for one chat turn.
+
+        Args:
+            total_seconds (float): Wall time the whole turn may take
+            shares (dict, optional): Fraction of the budget per stage, defaults to STAGE_SHARES
+            clock (callable): Monotonic clock, replaceable for tests and benchmarks
+        """
+        self.total_seconds = total_seconds
+        self.shares = shares or STAGE_SHARES
+        self.clock = clock
+        self.started = clock()
+
+    def remaining(self):
+        return max(0.0, self.total_seconds - (self.clock() - self.started))
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def budget(self, stage, essential=False):
+        """
+        Seconds the next call of `stage` may take.
+
+        Args:
+            stage (str): Stage name from STAGE_SHARES
+            essential (bool): The turn cannot answer without this stage, so it gets
+            whatever is left of the turn rather than only its share
+
+        Returns:
+            float: Timeout for the call, 0 when the turn's time is used up or an
+            optional stage should be skipped
+        """
+        if essential:
+            return self.remaining()
+        return min(self.total_seconds * self.shares.get(stage, 0.1), self.remaining())
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Fail fast on an upstream that keeps failing.
+
+        After `failure_threshold` consecutive failures the breaker opens and calls
+        are rejected with CircuitOpenError. After `reset_timeout` seconds a single
+        probe call is let through; its outcome closes or re-opens the breaker.
+
+        Args:
+            name (str): Upstream name, e.g. 'openai', 'api_ninjas' or 'youtube'
+            failure_threshold (int): Consecutive failures before opening
+            reset_timeout (float): Seconds to stay open before probing
+            clock (callable): Monotonic clock
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def is_open(self):
+        """Whether calls are currently being rejected, without using up a probe."""
+        with self._lock:
+            return self.state == self.OPEN and self.clock() - self.opened_at < self.reset_timeout
+
+    def allow(self):
+        """Whether a call may go to the upstream right now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    def call(self, fn, *args, wait_timeout=None, **kwargs):
+        """
+        Call `fn` through the breaker.
+
+        Args:
+            fn (callable): The upstream call
+            wait_timeout (float, optional): Abandon the call after this many seconds. Use
+            it for calls that cannot take a timeout themselves; the call keeps running
+            on a worker thread but the caller stops waiting.
+
+        Raises:
+            CircuitOpenError: The breaker is open
+            TimeoutError: The call did not finish within `wait_timeout`, or
+            `wait_timeout` was already used up; that is not the upstream's fault
+            and does not count as a failure
+        """
+        if wait_timeout is not None and wait_timeout <= 0:
+            raise TimeoutError("no time left in the turn budget")
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            if wait_timeout is None:
+                result = fn(*args, **kwargs)
+            else:
+                result = call_with_timeout(fn, wait_timeout, *args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+def call_with_timeout(fn, timeout, *args, **kwargs):
+    """
+    Run `fn` on a worker thread and wait at most `timeout` seconds for it.
+
+    Raises:
+        TimeoutError: The call did not finish in time, or MAX_IN_FLIGHT earlier
+        calls are still running
+    """
+    if timeout <= 0:
+        raise TimeoutError("no time left in the turn budget")
+    if not _in_flight.acquire(blocking=False):
+        raise TimeoutError(f"{MAX_IN_FLIGHT} earlier calls are still running")
+    try:
+        future = _executor.submit(fn, *args, **kwargs)
+    except Exception:
+        _in_flight.release()
+        raise
+    future.add_done_callback(lambda _: _in_flight.release())
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise TimeoutError(f"call did not finish within {timeout:.1f}s")
+
+
+def default_breakers():
+    """One breaker per upstream used by the WorkoutBot pipeline."""
+    return {
+        'openai': CircuitBreaker('openai'),
+        'api_ninjas': CircuitBreaker('api_ninjas'),
+        'youtube': CircuitBreaker('youtube'),
+    }
@@ -0,0 +1,140 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class Span:
+    def __init__(self, stage, turn_id=None):
+        """
+        Timing record for one stage of a chat turn.
+
+        Args:
+            stage (str): Stage name, e.g. 'tool_choice' or 'youtube'
+            turn_id (int, optional): Chat turn the stage belongs to
+        """
+        self.stage = stage
+        self.turn_id = turn_id
+        self.started_at = datetime.now().isoformat()
+        self.duration_ms = None
+        self.tokens = None
+        self.error = None
+
+    def set(self, tokens=None, error=None):
+        """Attach token usage or an error message to the span."""
+        if tokens is not None:
+            self.tokens = (self.tokens or 0) + tokens
+        if error is not None:
+            self.error = str(error)
+
+    def to_dict(self):
+        return {
+            'stage': self.stage,
+            'turn_id': self.turn_id,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'tokens': self.tokens,
+            'error': self.error
+        }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Tracer:
+    def __init__(self, max_spans=5000):
+        """
+        Collect spans in memory and aggregate them per stage.
+
+        Args:
+            max_spans (int): Spans kept for export and per stage for percentiles.
+            Older spans are dropped first.
+        """
+        self.max_spans = max_spans
+        self.spans = deque(maxlen=max_spans)
+        self.durations = {}
+        self._turns = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start_turn(self):
+        """Return a new turn id to group the spans of one chat turn."""
+        with self._lock:
+            self._turns += 1
+            return self._turns
+
+    @contextmanager
+    def span(self, stage, turn_id=None):
+        """
+        Time the enclosed block as `stage`. Exceptions are recorded on the span
+        and re-raised.
+        """
+        span = Span(stage, turn_id)
+        stack = self._stack()
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            stack.pop()
+            self.record(span)
+
+    def annotate(self, tokens=None, error=None):
+        """Attach data to the innermost open span of the current thread, if any."""
+        stack = self._stack()
+        if stack:
+            stack[-1].set(tokens=tokens, error=error)
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+            self.durations.setdefault(span.stage, deque(maxlen=self.max_spans)).append(span.duration_ms)
+
+    def summary(self):
+        """
+        Per-stage latency histogram.
+
+        Returns:
+            list: One dict per stage with count, p50, p95, p99 and max in milliseconds
+        """
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self.durations.items()}
+        rows = []
+        for stage, values in durations.items():
+            rows.append({
+                'stage': stage,
+                'count': len(values),
+                'p50_ms': percentile(values, 50),
+                'p95_ms': percentile(values, 95),
+                'p99_ms': percentile(values, 99),
+                'max_ms': values[-1] if values else None
+            })
+        return rows
+
+    def to_jsonl(self):
+        """Export the retained spans as JSON lines."""
+        with self._lock:
+            spans = list(self.spans)
+        return "\n".join(json.dumps(span.to_dict()) for span in spans)
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.durations.clear()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
@@ -0,0 +1,125 @@
+import json
+import os
+from datetime import datetime, timedelta
+from core.adherence import update_adherence_plans
+from core.exercise_names import exercise_names, save_exercise_names
+
+
+def memory_path(user_id):
+    return f'file/exercise_memory_{user_id}.json'
+
+
+class ExerciseMemoryTracker:
+    def __init__(self, user_id):
+        """
+        Initialize the exercise memory tracker for a specific user.
+        
+        Args:
+            user_id (str): Unique identifier for the user
+        """
+        self.user_id = user_id
+        self.memory_file = memory_path(user_id)
+        
+        os.makedirs('file', exist_ok=True)
+
+        if not os.path.exists(self.memory_file):
+            with open(self.memory_file, 'w') as f:
+                json.dump([], f)
+    
+    def store_exercise_memory(self, exercise_details):
+        """
+        Store exercise details in user's memory.
+        
+        Args:
+            exercise_details (dict): Dictionary containing exercise information
+            Expected keys: 
+            - 'muscle_group': str (e.g., 'biceps')
+            - 'exercise_name': str (e.g., 'barbell curls')
+            - 'difficulty': str (e.g., 'intermediate')
+            - 'workout_type': str (e.g., 'strength')
+        """
+        # Add timestamp
+        exercise_details['timestamp'] = datetime.now().isoformat()
+        exercise_names(self.user_id).canonicalize([exercise_details])
+        save_exercise_names(self.user_id)
+        
+        # Read existing memories
+        previous_mtime = os.path.getmtime(self.memory_file)
+        with open(self.memory_file, 'r') as f:
+            memories = json.load(f)
+        
+        # Append new memory
+        memories.append(exercise_details)
+        
+        # Write back to file
+        with open(self.memory_file, 'w') as f:
+            json.dump(memories, f, indent=2)
+        update_adherence_plans(self.user_id, [exercise_details], os.path.getmtime(self.memory_file), previous_mtime)
+    
+    def get_exercise_memories(self, days=None, muscle_group=None, workout_type=None):
+        """
+        Retrieve exercise memories with optional filtering.
+        
+        Args:
+            days (int, optional): Number of recent days to retrieve memories from
+            muscle_group (str, optional): Filter by specific muscle group
+            workout_type (str, optional): Filter by specific workout type
+        
+        Returns:
+            list: Filtered list of exercise memories, exercise names in canonical spelling
+        """
+        with open(self.memory_file, 'r') as f:
+            memories = json.load(f)
+        
+        # Filter memories
+        filtered_memories = memories
+        
+        if days:
+            cutoff_date = datetime.now() - timedelta(days=days)
+            filtered_memories = [
+                memory for memory in filtered_memories 
+                if datetime.fromisoformat(memory['timestamp']) >= cutoff_date
+            ]
+        
+        if muscle_group:
+            filtered_memories = [
+                memory for memory in filtered_memories
+                if memory.get('muscle_group', '').lower() == muscle_group.lower()
+            ]
+        
+        if workout_type:
+            filtered_memories = [
+                memory for memory in filtered_memories
+                if memory.get('workout_type', '').lower() == workout_type.lower()
+            ]
+        
+        return exercise_names(self.user_id).canonicalize(filtered_memories)
+    
+    def summarize_memories(self, days=30):
+        """
+        Generate a summary of exercise memories.
+        
+        Args:
+            days (int): Number of recent days to summarize
+        
+        Returns:
+            dict: Summary of exercise memories
+        """
+        memories = self.get_exercise_memories(days=days)
+        
+        summary = {
+            'total_exercises': len(memories),
+            'muscle_group_breakdown': {},
+            'workout_type_breakdown': {},
+            'difficulty_breakdown': {}
+        }
+        
+        for memory in memories:
+            muscle_group = memory.get('muscle_group', 'Unknown')
+            summary['muscle_group_breakdown'][muscle_group] = summary['muscle_group_breakdown'].get(muscle_group, 0) + 1
+            workout_type = memory.get('workout_type', 'Unknown')
+            summary['workout_type_breakdown'][workout_type] = summary['workout_type_breakdown'].get(workout_type, 0) + 1
+            difficulty = memory.get('difficulty', 'Unknown')
+            summary['difficulty_breakdown'][difficulty] = summary['difficulty_breakdown'].get(difficulty, 0) + 1
+        
+        return summary
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+# Rolling windows, in days, for acute and chronic training load
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+
+def set_matrices(df):
+    """
+    Parsed set weights and reps as (rows, 3) arrays.
+
+    Args:
+        df (DataFrame): Typed frame with the parsed set columns from workout_sets
+
+    Returns:
+        tuple: (weights, reps), float64 arrays with NaN for missing values
+    """
+    weights = np.column_stack([df[f'set_{n}_weight'].to_numpy('float64') for n in (1, 2, 3)])
+    reps = np.column_stack([df[f'set_{n}_reps'].to_numpy('float64') for n in (1, 2, 3)])
+    return weights, reps
+
+
+def row_load(weights, reps):
+    """
+    Volume and estimated one-rep max of each logged exercise.
+
+    Volume is the sum of weight x reps over the sets. The e1RM is the best set
+    by the Epley formula, weight x (1 + reps / 30), with a single rep counting
+    as the weight itself. Bodyweight and unparsable sets contribute neither.
+
+    Returns:
+        tuple: (volume, e1rm, sets) arrays, one entry per row; e1rm is NaN for
+        rows without a weighted set
+    """
+    volume = np.nansum(weights * reps, axis=1)
+    e1rm_sets = np.where(reps == 1, weights, weights * (1 + reps / 30))
+    e1rm_sets[~(reps >= 1)] = np.nan
+    e1rm = np.fmax.reduce(e1rm_sets, axis=1)
+    sets = np.count_nonzero(reps >= 1, axis=1)
+    return volume, e1rm, sets
+
+
+def daily_load(days, volume, end=None):
+    """
+    Daily volume with rolling acute and chronic load.
+
+    Args:
+        days (ndarray): datetime64[D] date of each row
+        volume (ndarray): Volume of each row
+        end (date, optional): Last day of the series; defaults to the last logged day
+
+    Returns:
+        DataFrame: 'date', 'volume', 'acute' (7-day mean), 'chronic' (28-day mean)
+        and 'acwr' (acute:chronic ratio, NaN while chronic load is zero), one row
+        per calendar day
+    """
+    start = days.min()
+    last = days.max() if end is None else max(days.max(), np.datetime64(pd.Timestamp(end).date(), 'D'))
+    span = int((last - start).astype('int64')) + 1
+    daily = np.bincount((days - start).astype('int64'), weights=volume, minlength=span)
+
+    cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+    positions = np.arange(1, span + 1)
+    acute = (cumulative[positions] - cumulative[np.maximum(positions - ACUTE_DAYS, 0)]) / ACUTE_DAYS
+    chronic = (cumulative[positions] - cumulative[np.maximum(positions - CHRONIC_DAYS, 0)]) / CHRONIC_DAYS
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+
+    return pd.DataFrame({
+        'date': np.arange(start, last + 1),
+        'volume': daily,
+        'acute': acute,
+        'chronic': chronic,
+        'acwr': acwr
+    })
+
+
+def group_load(values, volume, e1rm, sets):
+    """
+    Volume, best e1RM and set count per value of a column.
+
+    Args:
+        values (Series): Column to group by, e.g. 'exercise_name' or 'muscle_group'
+
+    Returns:
+        DataFrame: Indexed by value, sorted by volume, largest first
+    """
+    codes, names = pd.factorize(values, use_na_sentinel=True)
+    known = codes >= 0
+    codes = codes[known]
+    groups = len(names)
+    best = np.full(groups, np.nan)
+    np.fmax.at(best, codes, e1rm[known])
+    return pd.DataFrame({
+        'volume': np.bincount(codes, weights=volume[known], minlength=groups),
+        'best_e1rm': best,
+        'sets': np.bincount(codes, weights=sets[known], minlength=groups).astype('int64')
+    }, index=pd.Index(np.asarray(names), name=values.name)).sort_values('volume', ascending=False)
+
+
+def training_load(df, cutoff=None, end=None):
+    """
+    Training load for a user's workout log in one vectorized pass.
+
+    Args:
+        df (DataFrame): The user's full typed log; rolling loads need history
+        before the period being looked at
+        cutoff (datetime, optional): Start of the period the per-exercise and
+        per-muscle tables cover
+        end (date, optional): Last day of the daily series, e.g. today
+
+    Returns:
+        dict: 'rows' (DataFrame of 'volume', 'e1rm' and 'sets' aligned with df),
+        'daily' (see daily_load), 'exercises' and 'muscles' (see group_load)
+    """
+    weights, reps = set_matrices(df)
+    volume, e1rm, sets = row_load(weights, reps)
+    days = df['date'].to_numpy('datetime64[D]')
+
+    in_period = np.ones(len(df), dtype=bool) if cutoff is None else days >= np.datetime64(pd.Timestamp(cutoff).date(), 'D')
+    period = df.loc[in_period]
+    return {
+        'rows': pd.DataFrame({'volume': volume, 'e1rm': e1rm, 'sets': sets}, index=df.index),
+        'daily': daily_load(days, volume, end),
+        'exercises': group_load(period['exercise_name'], volume[in_period], e1rm[in_period], sets[in_period]),
+        'muscles': group_load(period['muscle_group'], volume[in_period], e1rm[in_period], sets[in_period])
+    }
+
+
+def load_summary(load, top=5, as_of=None):
+    """
+    Compact, JSON-ready training load figures for the WorkoutBot analysis prompt.
+
+    Args:
+        load (dict): Output of training_load
+        top (int): Number of exercises to report an e1RM for
+        as_of (str or date, optional): Day to take the acute and chronic load at,
+        e.g. the last logged day, so the figures only change when the log does.
+        Defaults to the last day of the daily series.
+
+    Returns:
+        dict: Acute and chronic load and their ratio, total volume per muscle
+        group and the best e1RM of the highest-volume exercises
+    """
+    daily = load['daily']
+    if as_of is not None:
+        daily = daily[daily['date'] <= np.datetime64(pd.Timestamp(as_of).date(), 'D')]
+    latest = daily.iloc[-1]
+    exercises = load['exercises'].dropna(subset=['best_e1rm']).head(top)
+    return {
+        'acute_daily_volume': round(float(latest['acute']), 1),
+        'chronic_daily_volume': round(float(latest['chronic']), 1),
+        'acute_chronic_ratio': None if np.isnan(latest['acwr']) else round(float(latest['acwr']), 2),
+        'muscle_group_volume': {str(name): round(float(v), 1) for name, v in load['muscles']['volume'].items()},
+        'exercise_best_e1rm': {str(name): round(float(v), 1) for name, v in exercises['best_e1rm'].items()}
+    }
@@ -0,0 +1,126 @@
+import glob
+import json
+import os
+
+
+def partition_dir(username):
+    return f"file/workout_log_parts_{username}"
+
+
+def manifest_path(username):
+    return os.path.join(partition_dir(username), "manifest.json")
+
+
+def month_of(date):
+    """'YYYY-MM' partition key of a 'YYYY-MM-DD' date."""
+    return str(date)[:7]
+
+
+def group_by_month(memories):
+    by_month = {}
+    for memory in memories:
+        month = month_of(memory.get('date', ''))
+        if month:
+            by_month.setdefault(month, []).append(memory)
+    return by_month
+
+
+def months_between(start=None, end=None, months=()):
+    """Stored partition keys overlapping the 'YYYY-MM-DD' range [start, end]."""
+    return [
+        month for month in sorted(months)
+        if (start is None or month >= month_of(start)) and (end is None or month <= month_of(end))
+    ]
+
+
+def read_manifest(username):
+    try:
+        with open(manifest_path(username), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_partition(username, month, records):
+    path = os.path.join(partition_dir(username), f"{month}.json")
+    if records:
+        with open(path, 'w') as f:
+            json.dump(records, f)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def build_partitions(username, memories, source_mtime=None):
+    """Rewrite every month partition of a user's log."""
+    os.makedirs(partition_dir(username), exist_ok=True)
+    by_month = group_by_month(memories)
+    for path in glob.glob(os.path.join(partition_dir(username), "????-??.json")):
+        if os.path.basename(path)[:7] not in by_month:
+            os.remove(path)
+    for month, records in by_month.items():
+        write_partition(username, month, records)
+    manifest = {'source_mtime': source_mtime, 'months': sorted(by_month)}
+    write_manifest(username, manifest)
+    return manifest
+
+
+def update_partitions(username, memories, changed_dates=None, source_mtime=None, previous_mtime=None):
+    """
+    Bring the month partitions in line with a freshly written log.
+
+    Args:
+        username (str): Owner of the log
+        memories (list): The complete log as written
+        changed_dates (iterable, optional): 'YYYY-MM-DD' dates touched by the write.
+        Only their months are rewritten; every partition is rebuilt if omitted.
+        source_mtime (float, optional): Modification time of the written log file
+        previous_mtime (float, optional): Modification time of the log before the write.
+        Partitions whose manifest does not match it are stale and get rebuilt.
+    """
+    manifest = read_manifest(username) if changed_dates is not None else None
+    if manifest is None or manifest.get('source_mtime') != previous_mtime:
+        return build_partitions(username, memories, source_mtime)
+
+    changed = {month_of(date) for date in changed_dates}
+    by_month = group_by_month(memory for memory in memories if month_of(memory.get('date', '')) in changed)
+    months = set(manifest['months'])
+    for month in changed:
+        write_partition(username, month, by_month.get(month, []))
+        if by_month.get(month):
+            months.add(month)
+        else:
+            months.discard(month)
+    manifest = {'source_mtime': source_mtime, 'months': sorted(months)}
+    write_manifest(username, manifest)
+    return manifest
+
+
+def read_partitions(username, manifest, start=None, end=None):
+    """
+    Log entries dated within [start, end], reading only the overlapping months.
+
+    Args:
+        username (str): Owner of the log
+        manifest (dict): Current manifest of the user's partitions
+        start (str, optional): First 'YYYY-MM-DD' date to include
+        end (str, optional): Last 'YYYY-MM-DD' date to include
+
+    Returns:
+        list: Log entries, oldest month first
+    """
+    records = []
+    for month in months_between(start, end, manifest['months']):
+        with open(os.path.join(partition_dir(username), f"{month}.json"), 'r') as f:
+            records.extend(json.load(f))
+    if start is not None or end is not None:
+        records = [
+            record for record in records
+            if (start is None or str(record.get('date', ''))[:10] >= start)
+            and (end is None or str(record.get('date', ''))[:10] <= end)
+        ]
+    return records
+
+
+def write_manifest(username, manifest):
+    with open(manifest_path(username), 'w') as f:
+        json.dump(manifest, f)
@@ -0,0 +1,646 @@
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict
+from core.exercise_names import exercise_key
+from core.resilience import CircuitOpenError, Deadline, default_breakers
+from core.reference_data import reference_data
+from core.tracing import Tracer
+
+NINJAS_URL = "https://api.api-ninjas.com/v1/exercises"
+
+# Wall time budget for one chat turn, split across stages by resilience.STAGE_SHARES
+TURN_BUDGET_SECONDS = 30
+
+# YouTube lookups running alongside the streamed answer in pipelined mode
+_video_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='youtube')
+# googleapiclient's httplib2 transport is not thread-safe, so YouTube requests
+# execute on an HTTP object owned by the worker thread running them
+_thread_http = threading.local()
+
+best_practices= '''
+    This guide provides a step-by-step approach to creating an effective workout:
+    Step 1: Define Your Goals
+    •	Weight Loss: Aim for a calorie deficit (0.5–1% of body weight per week).
+    •	Muscle Gain: Aim for a calorie surplus (0.25–0.5% of body weight per week).
+    •	Goals shape your workout and nutrition strategy.
+    Step 2: Design Your Exercises
+    •	Start simple with full-body workouts 2–3 times per week.
+    •	Focus on compound movements (target multiple muscles at once) for efficiency:
+    o	Quads: Squats, lunges.
+    o	Hamstrings/Glutes: Deadlifts, hip raises.
+    o	Push (Chest, Shoulders, Triceps): Push-ups, bench press.
+    o	Pull (Back, Biceps): Pull-ups, rows.
+    •	Add isolation exercises as you advance for targeted muscle development.
+    Step 3: Sets and Reps
+    •	Beginners: 2–5 sets, 5–15 reps per exercise.
+    •	Guidelines:
+    o	8–15 reps for fat burning and muscle building.
+    o	5–10 reps for strength.
+    •	Adjust weight if reps are too easy or too hard.
+    •	Total workout: 10–20 sets (all exercises combined).
+    Step 4: Rest Between Sets
+    •	Rest based on intensity:
+    o	Heavy lifting (1–3 reps): 3–5 minutes.
+    o	Moderate weight (8–12 reps): 1–2 minutes.
+    o	Endurance (13+ reps): Enough to maintain good form.
+    Step 5: How Much Weight to Lift
+    •	Start light and focus on proper form.
+    •	Use the "2-for-2 rule": Increase weight if you can do 2 extra reps beyond your target.
+    •	Beginners: Increase by 2–5 lbs (upper body) or 5–10 lbs (lower body).
+    •	Advanced: Increase by 5–10 lbs (upper) or 10–15 lbs (lower).
+    Step 6: Duration of Workout
+    •	Aim for 45 minutes to 1 hour, including:
+    o	Warm-up: 5–10 minutes (e.g., biking, jumping jacks).
+    o	Exercise: 10–20 sets of total work.
+    o	Cool-down/stretch: 5–10 minutes.
+    •	Less time? Increase intensity.
+    Step 7: Weekly Frequency
+    •	2–3 full-body workouts per week for beginners.
+    •	Allow 48 hours of recovery between workouts for muscle rebuilding.
+    Key Tips
+    1.	Consistency is crucial—choose a plan you can stick to.
+    2.	Progressive overload: Aim to lift heavier or do more reps over time.
+    3.	Combine strength training with proper nutrition for best results.
+    4.	Stretch after workouts to improve flexibility and recovery.
+'''
+
+# ----- Define Tools -----
+tools = [
+    {'type' : 'function',
+    'function':{
+        "name": "get_tips",
+        "description": "Get best practices of creating a workout and exercising in general including exercises, sets, reps, duration, frequency, etc."
+    }}
+]
+
+
+class Search_Result:
+    def __init__(self, search_result) -> None:
+        self.video_id = search_result['id']['videoId']
+        self.title = search_result['snippet']['title']
+        self.description = search_result['snippet']['description']
+        self.thumbnails = search_result['snippet']['thumbnails']['default']['url']
+
+class Search_Response:
+    def __init__(self, search_response) -> None:
+        self.prev_page_token = search_response.get('prevPageToken')
+        self.next_page_token = search_response.get('nextPageToken')
+
+        items = search_response.get('items')
+
+        self.search_results = []
+        for item in items:
+            search_result = Search_Result(item)
+            self.search_results.append(search_result)
+
+
+def get_yt_info(search_response):
+    for search_result in search_response.search_results:
+        result = f'Title: {search_result.title}. URL: https://www.youtube.com/watch?v={search_result.video_id}'
+        return result
+
+
+def format_video_links(links):
+    """Markdown list of form videos from a dict of exercise -> Search_Result (or None)."""
+    lines = []
+    for exercise, result in links.items():
+        if result is not None:
+            lines.append(f"- **{exercise}**: [{result.title}](https://www.youtube.com/watch?v={result.video_id})")
+    return "\n".join(lines)
+
+
+def thread_http(factory):
+    """The calling thread's HTTP object for YouTube requests, built with `factory` on first use."""
+    http = getattr(_thread_http, 'http', None)
+    if http is None:
+        http = _thread_http.http = factory()
+    return http
+
+
+def response_tokens(response):
+    """Total tokens reported by a non-streamed ChatCompletion, if any."""
+    usage = getattr(response, 'usage', None)
+    return getattr(usage, 'total_tokens', None)
+
+
+class WorkoutPipeline:
+    def __init__(self, client, youtube_client, ninjas_key, http=requests, tracer=None,
+                 equipment_index=None, notify=None, model='gpt-4o-mini', breakers=None,
+                 turn_budget=TURN_BUDGET_SECONDS, youtube_http=None):
+        """
+        The WorkoutBot chat turn, independent of Streamlit so it can be driven
+        by the page or by the offline benchmark.
+
+        Args:
+            client: OpenAI client (or a stand-in with the same chat.completions API)
+            youtube_client: googleapiclient YouTube resource (or a stand-in)
+            ninjas_key (str): API Ninjas key
+            http: Module or session with a requests-compatible get()
+            tracer (Tracer, optional): Span collector; a private one is used if omitted
+            equipment_index (EquipmentIndex, optional): Filters exercises by equipment
+            notify (callable, optional): Called with user-facing error messages
+            model (str): Chat model used for every completion
+            breakers (dict, optional): CircuitBreaker per upstream ('openai', 'api_ninjas',
+            'youtube'); share them across turns so a failing upstream stays tripped
+            turn_budget (float): Seconds one chat turn may take
+            youtube_http (callable, optional): Builds an HTTP object (e.g. httplib2.Http)
+            for YouTube requests; each worker thread gets its own. Requests execute on
+            the client's own HTTP object if omitted.
+        """
+        self.client = client
+        self.youtube_client = youtube_client
+        self.ninjas_key = ninjas_key
+        self.http = http
+        self.tracer = tracer or Tracer()
+        self.equipment_index = equipment_index
+        self.notify = notify or (lambda message: None)
+        self.model = model
+        self.breakers = breakers or default_breakers()
+        self.turn_budget = turn_budget
+        self.youtube_http = youtube_http
+
+    def new_deadline(self):
+        return Deadline(self.turn_budget)
+
+    def get_exercise_info(self, muscle, workout_type = None, difficulty = None, timeout = None) -> List[Dict]:
+        """Fetch exercise information from API Ninjas. Returns [] on failure."""
+        headers = {"X-Api-Key": self.ninjas_key}
+        params = {"muscle": muscle.lower()}
+        if workout_type:
+            params['type'] = workout_type.lower()
+        if difficulty:
+            params['difficulty'] = difficulty.lower()
+
+        def fetch():
+            response = self.http.get(NINJAS_URL, headers=headers, params=params, timeout=timeout)
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return self.breakers['api_ninjas'].call(fetch)
+        except CircuitOpenError as e:
+            self.tracer.annotate(error=e)
+            return []
+        except requests.exceptions.RequestException as e:
+            self.tracer.annotate(error=e)
+            self.notify(f"Error fetching exercise data: {str(e)}")
+            return []
+
+    def search_yt(self, query, max_results = 1, page_token = None, timeout = None): # I changed max results
+        """Search YouTube for a form video. Raises CircuitOpenError or TimeoutError when degraded."""
+        yt_request = self.youtube_client.search().list(
+            part = "snippet", # search by keyword
+            maxResults = max_results,
+            pageToken = page_token,
+            q = query + ' form', # I changed this
+
+            videoCaption = 'closedCaption', # Only including videos with caption.
+            type = 'video'
+        )
+        def execute():
+            if self.youtube_http is None:
+                return yt_request.execute()
+            return yt_request.execute(http=thread_http(self.youtube_http))
+
+        yt_response = self.breakers['youtube'].call(execute, wait_timeout=timeout)
+        search_response = Search_Response(yt_response)
+        return search_response
+
+    def chat_completion_request(self, messages, stream=True, tools=None, tool_choice=None, model=None, timeout=None,
+                                deadline=None):
+        """
+        Returns the completion (or stream), or None if OpenAI failed or its breaker is open.
+        The client's timeout applies to each read, so a stream is also cut off
+        once `deadline` runs out.
+        """
+        if timeout is not None and timeout <= 0:
+            self.tracer.annotate(error="no time left in the turn budget")
+            return None
+        try:
+            response = self.breakers['openai'].call(
+                self.client.chat.completions.create,
+                model=model or self.model,
+                messages = messages,
+                tools=tools,
+                tool_choice = tool_choice,
+                stream = stream,
+                timeout = timeout
+                )
+            if stream:
+                return self._guarded_stream(response, deadline)
+            return response
+        except CircuitOpenError as e:
+            self.tracer.annotate(error=e)
+            return None
+        except Exception as e:
+            self.tracer.annotate(error=e)
+            self.notify(f"Unable to generate ChatCompletion response. Exception: {e}")
+            return None
+
+    def _guarded_stream(self, stream, deadline=None):
+        """
+        Pass chunks through, tripping the OpenAI breaker if the stream breaks off
+        and closing it if the turn's deadline runs out first.
+        """
+        try:
+            for chunk in stream:
+                yield chunk
+                if deadline is not None and deadline.expired():
+                    self.tracer.annotate(error="stream cut off at the turn deadline")
+                    close = getattr(stream, 'close', None)
+                    if close is not None:
+                        close()
+                    break
+        except Exception as e:
+            self.breakers['openai'].record_failure()
+            self.notify(f"The response was interrupted: {e}")
+
+    def extract_muscle_group(self, text: str, timeout=None) -> list:
+        """
+        Extract muscle group from user input using OpenAI. Only muscles in
+        muscle_list.csv are returned, so stray words never reach API Ninjas.
+        Returns [] on failure, or without calling OpenAI when `timeout` is used up.
+        """
+        if timeout is not None and timeout <= 0:
+            self.tracer.annotate(error="no time left in the turn budget")
+            return []
+        muscles = reference_data()
+        try:
+            prompt = [
+                {"role": "system", "content": f'''
+                ONLY Assign one or more muscles groups.
+                The only possible muscles groups are: {', '.join(muscles.muscles)}
+                Return the muscle groups separated by a space, for example: "biceps triceps" or "chest".
+                If you cannot assign any muscle groups return "Exercises for that muscle group does not exist in this database"
+                '''},
+                {"role": "user", "content": text}
+            ]
+            response = self.breakers['openai'].call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=prompt,
+                temperature=0,
+                stream=False,
+                timeout=timeout
+            )
+            self.tracer.annotate(tokens=response_tokens(response))
+            # Convert the space-separated string into a list
+            muscle_groups = response.choices[0].message.content.lower().split()
+            return [group for group in muscle_groups if group in muscles.muscle_set]
+        except Exception as e:
+            self.tracer.annotate(error=e)
+            return []
+
+    def extract_exercises(self, text: str, timeout=None) -> list:
+        """
+        Extract exercises from a recommendation using OpenAI. Returns [] on failure,
+        or without calling OpenAI when `timeout` is used up.
+        """
+        if timeout is not None and timeout <= 0:
+            self.tracer.annotate(error="no time left in the turn budget")
+            return []
+        try:
+            prompt = [
+                {"role": "system", "content": '''
+                from the text provided, extract the exercises and only extract the exercises.
+                for example, if a text says, "Here are some good workouts, barbell curls, farmer's carry and Pull Ups", your output should look like this: "barbell curls, farmer's carry, Pull Ups"
+                '''},
+                {"role": "user", "content": text}
+            ]
+            response = self.breakers['openai'].call(
+                self.client.chat.completions.create,
+                model=self.model,
+                messages=prompt,
+                temperature=0,
+                stream=False,
+                timeout=timeout
+            )
+            self.tracer.annotate(tokens=response_tokens(response))
+            # Convert the space-separated string into a list
+            exercises = response.choices[0].message.content.lower().split(', ')
+            return [group for group in exercises if group]  # Ensure no empty strings
+        except Exception as e:
+            self.tracer.annotate(error=e)
+            return []
+
+    def prepare_turn(self, prompt, messages, workout_logs, difficulty, workout_type,
+                     available_equipment=None, turn_id=None, deadline=None, pipelined=False,
+                     muscle_recency=None):
+        """
+        Run every stage of a chat turn up to the final streamed answer.
+
+        Each upstream call gets a timeout from the turn's deadline. A stage that
+        fails, times out or hits an open circuit breaker is skipped and the turn
+        carries on with less context (no tips, no exercise info, no video links).
+
+        In pipelined mode the turn stops before the recommendation completion: the
+        final answer can start streaming right away, and video links for the
+        'candidates' the answer names are looked up alongside it with
+        start_mentioned_lookups().
+
+        Args:
+            prompt (str): The user's latest message
+            messages (list): Chat history, including the latest user message
+            workout_logs (list): The user's workout log history, or None
+            difficulty (str): Selected difficulty level
+            workout_type (str): Selected workout type
+            available_equipment (set, optional): Normalized equipment the user has access to
+            turn_id (int, optional): Tracer turn id for the spans
+            deadline (Deadline, optional): Budget for the turn; a new one is started if omitted
+            pipelined (bool): Skip the blocking recommendation/YouTube stages
+            muscle_recency (dict, optional): recency_summary of the user's muscle recency index
+
+        Returns:
+            dict: 'messages' to pass to the final completion, 'workouts' recommended,
+            'muscle_groups' extracted from the prompt, 'candidates' (exercises offered
+            to the model), the turn's 'deadline' and the list of 'degraded' stages
+        """
+        tracer = self.tracer
+        deadline = deadline or self.new_deadline()
+        degraded = []
+
+        # conversation history buffer (maybe later)
+        messages_to_pass = list(messages)
+
+        system_message = {'role':'system',
+                    'content':\
+                    f"""
+                    You are a knowledgeable and friendly fitness instructor.
+                    Keep responses concise and engaging.
+                    """}
+
+        messages_to_pass.insert(0,system_message)
+        if workout_logs:
+            workout_history_message = {'role': 'system',
+                                    'content':\
+                                    f"""
+                                    User's workout history is available in these logs: {workout_logs}
+                                    If they ask about their workout history, you can check these logs and provide information about their exercises, progress, and patterns.
+                                    """}
+            messages_to_pass.insert(1, workout_history_message)
+        if muscle_recency:
+            recency_message = {'role': 'system',
+                               'content':\
+                               f"""
+                               Days since the user last trained each muscle, and how many exercises they logged for it in the last 7 and 28 days: {muscle_recency}
+                               Prefer muscles that are neglected or never trained, and avoid muscles listed as resting unless the user asks for them.
+                               """}
+            messages_to_pass.insert(len(messages_to_pass) - len(messages), recency_message)
+        # first llm call
+        with tracer.span('tool_choice', turn_id) as span:
+            response = self.chat_completion_request(messages_to_pass, stream = False, tools = tools, tool_choice="auto",
+                                                    timeout = deadline.budget('tool_choice'))
+            span.set(tokens=response_tokens(response))
+
+        # Call tool if tools needds to be called
+        tool_calls = response.choices[0].message.tool_calls if response is not None else None
+        if response is None:
+            degraded.append('tool_choice')
+        tips_info = " "
+        if tool_calls:
+            # If true the model will return the name of the tool / function to call and the arguments
+            tool_function_name = tool_calls[0].function.name
+
+            if tool_function_name == 'get_tips':
+                tips_info = best_practices
+            else:
+                self.notify(f'Error: function {tool_function_name} does not exist')
+
+        with tracer.span('extract_muscle_group', turn_id):
+            muscle_group_list = self.extract_muscle_group(prompt, timeout = deadline.budget('extract_muscle_group'))
+
+        # Get exercise information
+        exercise_info = {}
+        ninjas_budget = deadline.budget('api_ninjas')
+        for muscle_group in muscle_group_list:
+            timeout = min(ninjas_budget / len(muscle_group_list), deadline.remaining())
+            if timeout <= 0 or self.breakers['api_ninjas'].is_open():
+                degraded.append('api_ninjas')
+                break
+            with tracer.span('api_ninjas', turn_id):
+                exercises = self.get_exercise_info(muscle_group, workout_type, difficulty, timeout = timeout)
+            if self.equipment_index is not None:
+                self.equipment_index.add_exercises(exercises)
+                if available_equipment is not None:
+                    exercises = self.equipment_index.filter_exercises(exercises, available_equipment)
+            for ex in exercises[:3]:
+                exercise_info[ex['name']]= f"difficulty: {ex['difficulty']}, equipment needed: {ex['equipment']}, type {ex['type']}, Here are some instructional videos:\n"
+
+        if self.equipment_index is not None:
+            candidate_equipment = self.equipment_index.candidate_equipment(exercise_info.keys(), available_equipment)
+        else:
+            candidate_equipment = []
+        # Without candidates (API Ninjas degraded, no muscle group, everything filtered
+        # out) fall back to what the user selected rather than claiming bodyweight only
+        if not candidate_equipment and available_equipment is not None:
+            display = self.equipment_index.display_name if self.equipment_index is not None else str
+            candidate_equipment = sorted(display(key) for key in available_equipment)
+        equipment_line = f"Available equipment: {', '.join(candidate_equipment)}." if candidate_equipment else ""
+
+        system_message = {'role':'system',
+                    'content':\
+                    f"""
+                    You are a knowledgeable and friendly fitness instructor.
+                    Keep responses concise and engaging.
+
+                    {equipment_line}
+                    useful tips to generate workouts: {tips_info}
+                    useful exercise info: {exercise_info}
+
+                    """}
+
+        messages_to_pass.pop(0) # deleating the first SM
+        messages_to_pass.insert(0,system_message)
+
+        if pipelined:
+            messages_to_pass.append({'role': 'system', 'content':'''
+                    Instructional video links are added below your answer automatically. Do not include any links.
+    '''})
+            return {
+                'messages': messages_to_pass,
+                'workouts': [],
+                'muscle_groups': muscle_group_list,
+                'candidates': list(exercise_info),
+                'deadline': deadline,
+                'degraded': degraded
+            }
+
+        with tracer.span('recommendation', turn_id) as span:
+            recommendation = self.chat_completion_request(messages_to_pass, stream = False,
+                                                          timeout = deadline.budget('recommendation'))
+            span.set(tokens=response_tokens(recommendation))
+
+        workouts = []
+        if recommendation is None:
+            degraded.append('recommendation')
+        else:
+            with tracer.span('extract_exercises', turn_id):
+                workouts = self.extract_exercises(recommendation.choices[0].message.content,
+                                                  timeout = deadline.budget('extract_exercises'))
+
+        yt_urls = []
+        youtube_budget = deadline.budget('youtube')
+        for exercise in workouts:
+            timeout = min(youtube_budget / len(workouts), deadline.remaining())
+            if timeout <= 0 or self.breakers['youtube'].is_open():
+                degraded.append('youtube')
+                break
+            with tracer.span('youtube', turn_id):
+                try:
+                    yt_urls.append(get_yt_info(self.search_yt(exercise, timeout = timeout)))
+                except Exception as e:
+                    tracer.annotate(error=e)
+                    degraded.append('youtube')
+                    break
+
+        if yt_urls:
+            messages_to_pass.append({'role': 'system', 'content':f'''
+                    Youtube Links for exercises recommended: {yt_urls}
+                    Apply this to the workouts you recommend.
+    '''})
+        elif workouts:
+            messages_to_pass.append({'role': 'system', 'content':'''
+                    Video links are unavailable right now. Do not include any links in your answer.
+    '''})
+
+        return {
+            'messages': messages_to_pass,
+            'workouts': workouts,
+            'muscle_groups': muscle_group_list,
+            'candidates': list(exercise_info),
+            'deadline': deadline,
+            'degraded': degraded
+        }
+
+    def video_link(self, exercise, timeout, turn_id=None):
+        """First form video for an exercise, or None if YouTube is slow, failing or tripped."""
+        if timeout <= 0 or self.breakers['youtube'].is_open():
+            return None
+        with self.tracer.span('youtube', turn_id):
+            try:
+                search_response = self.search_yt(exercise, timeout = timeout)
+            except Exception as e:
+                self.tracer.annotate(error=e)
+                return None
+            return next(iter(search_response.search_results), None)
+
+    def start_video_lookups(self, exercises, deadline, lookups=None, turn_id=None):
+        """
+        Start YouTube lookups in the background.
+
+        Args:
+            exercises (iterable): Exercise names to look up
+            deadline (Deadline): The turn's budget; each lookup may take the YouTube share
+            lookups (dict, optional): Lookups already started; exercises in it, in any
+            spelling with the same exercise_key, are skipped
+            turn_id (int, optional): Tracer turn id for the spans
+
+        Returns:
+            dict: exercise -> Future resolving to a Search_Result or None
+        """
+        lookups = {} if lookups is None else lookups
+        started = {exercise_key(name) for name in lookups}
+        for exercise in exercises:
+            key = exercise_key(exercise)
+            if not key or key in started:
+                continue
+            started.add(key)
+            lookups[exercise] = _video_executor.submit(self.video_link, exercise, deadline.budget('youtube'), turn_id)
+        return lookups
+
+    def start_mentioned_lookups(self, candidates, deadline, lookups, turn_id=None):
+        """
+        Build an on_text callback for interleave_lookups that starts a video lookup
+        for each candidate once the streamed answer names it, so candidates the
+        answer leaves out cost no YouTube quota. Names are compared by exercise_key,
+        and each chunk is scanned once, with a tail of the previous text for names
+        split across chunks.
+
+        Args:
+            candidates (iterable): Exercises offered to the model ('candidates' of prepare_turn)
+            deadline (Deadline): The turn's budget
+            lookups (dict): Lookups of the turn; started lookups are added to it
+            turn_id (int, optional): Tracer turn id for the spans
+        """
+        pending = {exercise_key(exercise): exercise for exercise in candidates}
+        pending.pop('', None)
+        # Generous, since the answer may space or punctuate a name differently
+        overlap = 2 * max((len(exercise) for exercise in pending.values()), default=0)
+        tail = ''
+
+        def on_text(content):
+            nonlocal tail
+            window = tail + content
+            tail = window[-overlap:] if overlap else ''
+            text_key = exercise_key(window)
+            mentioned = [pending.pop(key) for key in [key for key in pending if key in text_key]]
+            if mentioned:
+                self.start_video_lookups(mentioned, deadline, lookups, turn_id)
+        return on_text
+
+    def stream_answer(self, messages_to_pass, deadline=None):
+        """
+        Start the final streamed completion for a prepared turn. The answer gets
+        whatever is left of the turn's budget and is cut off when it runs out.
+
+        Returns:
+            The stream, or None if OpenAI is unavailable
+        """
+        deadline = deadline or self.new_deadline()
+        return self.chat_completion_request(messages_to_pass, timeout = deadline.budget('final_stream', essential=True),
+                                            deadline = deadline)
+
+
+def interleave_lookups(stream, lookups, on_ready, on_text=None):
+    """
+    Pass a streamed answer through, calling on_ready(exercise, result) on the
+    caller's thread for every video lookup that finished since the last chunk,
+    and on_text(text) with the text of every chunk that adds some.
+    """
+    reported = set()
+
+    def report_done():
+        for exercise, future in list(lookups.items()):
+            if exercise not in reported and future.done():
+                reported.add(exercise)
+                on_ready(exercise, future.result())
+
+    for chunk in stream:
+        content = chunk.choices[0].delta.content if on_text is not None and chunk.choices else None
+        if content:
+            on_text(content)
+        report_done()
+        yield chunk
+    report_done()
+
+
+def drop_lookups(lookups, keep):
+    """
+    Cancel and remove the lookups for exercises not in `keep`, e.g. candidates the
+    answer named that extract_exercises did not pick up. Names match by
+    exercise_key, so a lookup started for another spelling is kept.
+
+    Returns:
+        list: The dropped exercises
+    """
+    kept = {exercise_key(exercise) for exercise in keep}
+    dropped = [exercise for exercise in lookups if exercise_key(exercise) not in kept]
+    for exercise in dropped:
+        lookups.pop(exercise).cancel()
+    return dropped
+
+
+def wait_lookups(lookups, deadline, on_ready):
+    """
+    Call on_ready(exercise, result) as each remaining lookup finishes, giving up
+    when the turn's deadline runs out. Lookups that have not started by then are
+    cancelled.
+    """
+    pending = {future: exercise for exercise, future in lookups.items()}
+    while pending and not deadline.expired():
+        done, _ = wait(list(pending), timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+        for future in done:
+            on_ready(pending.pop(future), future.result())
+    for future in pending:
+        future.cancel()
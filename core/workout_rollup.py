@@ -0,0 +1,147 @@
+import json
+import os
+from collections import Counter
+import pandas as pd
+
+ROLLUP_DIMENSIONS = ('workout_type', 'muscle_group', 'difficulty', 'exercise_name')
+
+
+def rollup_path(username):
+    return f"file/workout_rollup_{username}.json"
+
+
+def summarize_day(records):
+    """
+    Count one day's log entries.
+
+    Returns:
+        dict: 'total' plus a {value: count} mapping per dimension in ROLLUP_DIMENSIONS
+    """
+    day = {'total': len(records)}
+    for dimension in ROLLUP_DIMENSIONS:
+        day[dimension] = dict(Counter(str(record.get(dimension, 'Unknown')) for record in records))
+    return day
+
+
+def group_by_date(memories):
+    by_date = {}
+    for memory in memories:
+        by_date.setdefault(str(memory.get('date', ''))[:10], []).append(memory)
+    return by_date
+
+
+def build_rollup(memories, source_mtime=None):
+    """Build the full daily rollup for a workout log."""
+    days = {date: summarize_day(records) for date, records in group_by_date(memories).items() if date}
+    return {'source_mtime': source_mtime, 'days': days}
+
+
+def update_rollup(username, memories, changed_dates=None, source_mtime=None, previous_mtime=None):
+    """
+    Bring the stored rollup in line with a freshly written log.
+
+    Args:
+        username (str): Owner of the log
+        memories (list): The complete log as written
+        changed_dates (iterable, optional): 'YYYY-MM-DD' dates touched by the write.
+        Only these days are recounted; the whole rollup is rebuilt if omitted.
+        source_mtime (float, optional): Modification time of the written log file
+        previous_mtime (float, optional): Modification time of the log before the write.
+        A stored rollup that does not match it is stale and gets rebuilt.
+    """
+    rollup = read_rollup(username) if changed_dates is not None else None
+    if rollup is None or rollup.get('source_mtime') != previous_mtime:
+        rollup = build_rollup(memories, source_mtime)
+    else:
+        changed = {str(date)[:10] for date in changed_dates}
+        by_date = group_by_date(memory for memory in memories if str(memory.get('date', ''))[:10] in changed)
+        for date in changed:
+            if by_date.get(date):
+                rollup['days'][date] = summarize_day(by_date[date])
+            else:
+                rollup['days'].pop(date, None)
+        rollup['source_mtime'] = source_mtime
+    write_rollup(username, rollup)
+    return rollup
+
+
+def days_in_period(rollup, cutoff=None):
+    """Rollup days on or after `cutoff` (a datetime), oldest first."""
+    days = sorted(rollup['days'].items())
+    if cutoff is None:
+        return days
+    return [(date, day) for date, day in days if pd.Timestamp(date) >= cutoff]
+
+
+def rollup_frame(days, dimension):
+    """
+    Long-form daily counts for one dimension.
+
+    Returns:
+        DataFrame: columns 'date' (datetime64), `dimension` and 'count'
+    """
+    rows = [(date, value, count) for date, day in days for value, count in day[dimension].items()]
+    df = pd.DataFrame(rows, columns=['date', dimension, 'count'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def rollup_totals(days, dimension):
+    """Total count per value of `dimension` over the given days."""
+    totals = Counter()
+    for _, day in days:
+        totals.update(day[dimension])
+    return pd.Series(dict(totals), name='count', dtype='int64').rename_axis(dimension).sort_values(ascending=False)
+
+
+def rollup_metrics(days):
+    """
+    Metric tiles from the rollup.
+
+    Returns:
+        dict: 'total_workouts', 'unique_exercises' and 'days_active'
+    """
+    exercises = set()
+    for _, day in days:
+        exercises.update(day['exercise_name'])
+    return {
+        'total_workouts': sum(day['total'] for _, day in days),
+        'unique_exercises': len(exercises),
+        'days_active': sum(1 for _, day in days if day['total'])
+    }
+
+
+def rollup_aggregates(days):
+    """
+    The aggregates the WorkoutBot analysis report is generated from.
+
+    Returns:
+        dict: Date range, totals and the muscle group, workout type and difficulty
+        distributions over the given days
+    """
+    start_date, end_date = days[0][0], days[-1][0]
+    metrics = rollup_metrics(days)
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'total_days': (pd.Timestamp(end_date) - pd.Timestamp(start_date)).days + 1,
+        'total_workouts': metrics['total_workouts'],
+        'days_active': metrics['days_active'],
+        'muscle_groups': rollup_totals(days, 'muscle_group').to_dict(),
+        'workout_types': rollup_totals(days, 'workout_type').to_dict(),
+        'difficulty_levels': rollup_totals(days, 'difficulty').to_dict()
+    }
+
+
+def read_rollup(username):
+    try:
+        with open(rollup_path(username), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_rollup(username, rollup):
+    os.makedirs('file', exist_ok=True)
+    with open(rollup_path(username), 'w') as f:
+        json.dump(rollup, f)
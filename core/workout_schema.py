@@ -0,0 +1,81 @@
+import pandas as pd
+from core.exercise_names import exercise_names
+from core.workout_sets import PARSED_SET_COLUMNS, SET_COLUMNS, parse_set_columns
+
+# Low-cardinality text columns, stored once per distinct value
+CATEGORY_COLUMNS = ['username', 'exercise_name', 'muscle_group', 'workout_type', 'difficulty', 'equipment_used']
+
+LOG_COLUMNS = ['username', 'date', 'exercise_name', 'muscle_group', 'workout_type', 'difficulty'] + SET_COLUMNS
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def workout_frame(records, columns=LOG_COLUMNS, parse_sets=True, username=None):
+    """
+    Build the typed in-memory frame every workout log loader shares.
+
+    Text columns in CATEGORY_COLUMNS become categoricals, 'date' is parsed once
+    into datetime64 at day precision and, with `parse_sets`, the raw set strings
+    are parsed into the numeric set columns from workout_sets. Raw set strings are
+    categoricals too, since the same "135/8" repeats across the log. With a
+    `username`, exercise names are mapped to their canonical spelling in that
+    user's dictionary, once per distinct name.
+
+    Args:
+        records (list): Log entries as read from JSON
+        columns (list): Columns that must exist; missing ones are filled with "NA"
+        parse_sets (bool): Whether to add the parsed set columns
+        username (str, optional): Owner of the records
+
+    Returns:
+        DataFrame: The typed frame, or None if there are no records
+    """
+    if not records:
+        return None
+
+    df = pd.DataFrame.from_records(records)
+    for col in columns:
+        if col not in df.columns:
+            df[col] = "NA"
+
+    if parse_sets:
+        df = parse_set_columns(df)
+        for set_num in (1, 2, 3):
+            df[f'set_{set_num}_weight'] = df[f'set_{set_num}_weight'].astype('float32')
+            df[f'set_{set_num}_reps'] = df[f'set_{set_num}_reps'].astype('float32')
+
+    if 'date' in df.columns:
+        df['date'] = pd.to_datetime(df['date'], format='mixed').dt.normalize()
+
+    if username is not None and 'exercise_name' in df.columns:
+        df['exercise_name'] = df['exercise_name'].astype('category').map(exercise_names(username).canonical)
+
+    text_columns = [col for col in CATEGORY_COLUMNS + SET_COLUMNS if col in df.columns]
+    df[text_columns] = df[text_columns].astype('category')
+    return df
+
+
+def is_on_day(df, day):
+    """Boolean mask of rows logged on `day` (a date, datetime or 'YYYY-MM-DD')."""
+    return df['date'].to_numpy() == pd.Timestamp(day).normalize().to_datetime64()
+
+
+def editor_frame(df, columns=None):
+    """
+    Plain copy of a typed frame for st.data_editor and saving back to JSON.
+
+    Dates are formatted once, column-wise, as 'YYYY-MM-DD' (the format stored in
+    the log) and categoricals become plain strings so edits can hold any value.
+
+    Args:
+        df (DataFrame): Typed frame from workout_frame
+        columns (list, optional): Columns to keep; parsed set columns are always dropped
+    """
+    df = df[columns] if columns is not None else df.drop(columns=PARSED_SET_COLUMNS, errors='ignore')
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('object')
+    if 'date' in df.columns:
+        df['date'] = df['date'].dt.strftime(DATE_FORMAT)
+    return df
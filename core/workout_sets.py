@@ -0,0 +1,63 @@
+import re
+import pandas as pd
+
+SET_COLUMNS = [
+    'lbs/bw_reps for first set',
+    'lbs/bw_reps for second set',
+    'lbs/bw_reps for third set'
+]
+
+PARSED_SET_COLUMNS = [
+    f'set_{set_num}_{field}'
+    for set_num in (1, 2, 3)
+    for field in ('weight', 'reps', 'is_bodyweight')
+]
+
+# "135/8", "135_8", "135 lbs x 8", "bw/12", "bw_12", "BW x 12" or just a weight "135"
+SET_PATTERN = re.compile(
+    r'^\s*(?:(?P<weight>\d+(?:\.\d+)?)\s*(?:lbs?|#)?|(?P<bw>bw|body\s*weight))'
+    r'\s*(?:[/_x×*@,]\s*(?P<reps>\d+))?',
+    re.IGNORECASE
+)
+
+
+def parse_set_column(values: pd.Series) -> pd.DataFrame:
+    """
+    Parse one "lbs/bw_reps" column with a single vectorized regex pass.
+
+    Args:
+        values (Series): Raw set entries such as "135/8" or "bw/12"
+
+    Returns:
+        DataFrame: 'weight' (float, NaN for bodyweight or unparsable entries),
+        'reps' (float, NaN when missing) and 'is_bodyweight' (bool), same index
+
+    Example:
+        >>> parse_set_column(pd.Series(['135/8', '135_10', 'bw_12', 'NA'])).to_dict('records')
+        [{'weight': 135.0, 'reps': 8.0, 'is_bodyweight': False}, {'weight': 135.0, 'reps': 10.0, 'is_bodyweight': False}, {'weight': nan, 'reps': 12.0, 'is_bodyweight': True}, {'weight': nan, 'reps': nan, 'is_bodyweight': False}]
+    """
+    parts = values.astype('string').str.extract(SET_PATTERN)
+    return pd.DataFrame({
+        'weight': pd.to_numeric(parts['weight'], errors='coerce').astype('float64'),
+        'reps': pd.to_numeric(parts['reps'], errors='coerce').astype('float64'),
+        'is_bodyweight': parts['bw'].notna().to_numpy()
+    }, index=values.index)
+
+
+def parse_set_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add typed set columns to a workout log DataFrame.
+
+    For each set n in 1..3 adds 'set_n_weight', 'set_n_reps' and
+    'set_n_is_bodyweight'. Missing set columns parse as empty.
+
+    Returns:
+        DataFrame: The same frame, with the parsed columns added
+    """
+    for set_num, col_name in enumerate(SET_COLUMNS, start=1):
+        raw = df[col_name] if col_name in df.columns else pd.Series(pd.NA, index=df.index)
+        parsed = parse_set_column(raw)
+        df[f'set_{set_num}_weight'] = parsed['weight']
+        df[f'set_{set_num}_reps'] = parsed['reps']
+        df[f'set_{set_num}_is_bodyweight'] = parsed['is_bodyweight']
+    return df
@@ -0,0 +1,189 @@
+import json
+import os
+from core.adherence import build_adherence, logged_index, plan_entries, probe_all, read_adherence, update_adherence_logs, write_adherence
+from core.exercise_names import exercise_names, save_exercise_names
+from core.workout_rollup import build_rollup, read_rollup, update_rollup, write_rollup
+from core.workout_partitions import build_partitions, read_manifest, read_partitions, update_partitions
+from core.muscle_recency import build_recency, read_recency, write_recency
+from core.tracker import memory_path
+
+
+def log_path(username):
+    return f"file/workout_log_hist_{username}.json"
+
+
+def read_log(username):
+    """
+    Load a user's workout log, with exercise names in their canonical spelling.
+
+    Returns:
+        list: Log entries, empty if the file is missing or unreadable
+    """
+    try:
+        with open(log_path(username), 'r') as f:
+            return exercise_names(username).canonicalize(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def log_key(memory, names):
+    """
+    Identity of a log entry: one entry per exercise per day, whatever the spelling
+    of the exercise within its normalized key.
+
+    Args:
+        memory (dict): Log entry
+        names (ExerciseNames): The owner's exercise name dictionary
+    """
+    return (names.lookup(memory['exercise_name']), memory['date'])
+
+
+def upsert_logs(username, memories, records):
+    """
+    Replace the entries with the same exercise and date as `records`, then append them.
+
+    Returns:
+        list: The updated log
+    """
+    names = exercise_names(username)
+    latest = {log_key(record, names): record for record in records}
+    return [memory for memory in memories if log_key(memory, names) not in latest] + list(latest.values())
+
+
+def delete_logs(username, memories, keys):
+    """
+    Drop the entries whose (exercise_name, date) is in `keys`. Names match in any
+    spelling with the same normalized key.
+
+    Returns:
+        list: The updated log
+    """
+    names = exercise_names(username)
+    keys = {(names.lookup(name), date) for name, date in keys}
+    return [memory for memory in memories if log_key(memory, names) not in keys]
+
+
+def write_log(username, memories, changed_dates=None):
+    """
+    Write a user's complete workout log and update the data derived from it.
+    Exercise names are written in their canonical spelling.
+
+    Args:
+        username (str): Owner of the log
+        memories (list): All log entries
+        changed_dates (iterable, optional): 'YYYY-MM-DD' dates the write touched, so
+        derived data only recomputes those days. Everything is recomputed if omitted.
+    """
+    os.makedirs('file', exist_ok=True)
+    exercise_names(username).canonicalize(memories)
+    save_exercise_names(username)
+    log_file = log_path(username)
+    previous_mtime = os.path.getmtime(log_file) if os.path.exists(log_file) else None
+    with open(log_file, 'w') as f:
+        json.dump(memories, f, indent=2)
+    source_mtime = os.path.getmtime(log_file)
+    rollup = update_rollup(username, memories, changed_dates, source_mtime, previous_mtime)
+    write_recency(username, build_recency(rollup))
+    update_partitions(username, memories, changed_dates, source_mtime, previous_mtime)
+    update_adherence_logs(username, memories, changed_dates, source_mtime, previous_mtime)
+
+
+def load_rollup(username):
+    """
+    Read a user's daily rollup, rebuilding it if the log changed behind its back.
+
+    Returns:
+        dict: The rollup, or None if the user has no log
+    """
+    log_file = log_path(username)
+    if not os.path.exists(log_file):
+        return None
+    source_mtime = os.path.getmtime(log_file)
+    rollup = read_rollup(username)
+    if rollup is None or rollup.get('source_mtime') != source_mtime:
+        rollup = build_rollup(read_log(username), source_mtime)
+        write_rollup(username, rollup)
+    return rollup
+
+
+def load_recency(username):
+    """
+    Read a user's per-muscle recency index, rebuilding it from the rollup if the
+    log changed behind its back.
+
+    Returns:
+        dict: The index, or None if the user has no log
+    """
+    rollup = load_rollup(username)
+    if rollup is None:
+        return None
+    index = read_recency(username)
+    if index is None or index.get('source_mtime') != rollup['source_mtime']:
+        index = build_recency(rollup)
+        write_recency(username, index)
+    return index
+
+
+def read_range(username, start=None, end=None):
+    """
+    Load the part of a user's workout log dated within [start, end].
+
+    Only the month partitions overlapping the range are opened; they are rebuilt
+    first if the log changed behind their back.
+
+    Args:
+        username (str): Owner of the log
+        start (str, optional): First 'YYYY-MM-DD' date to include
+        end (str, optional): Last 'YYYY-MM-DD' date to include
+
+    Returns:
+        list: Log entries, empty if the user has no log
+    """
+    log_file = log_path(username)
+    if not os.path.exists(log_file):
+        return []
+    source_mtime = os.path.getmtime(log_file)
+    manifest = read_manifest(username)
+    if manifest is None or manifest.get('source_mtime') != source_mtime:
+        manifest = build_partitions(username, read_log(username), source_mtime)
+    return read_partitions(username, manifest, start, end)
+
+
+def read_plans(username):
+    """A user's WorkoutBot exercise memory, empty if missing or unreadable."""
+    try:
+        with open(memory_path(username), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def load_adherence(username):
+    """
+    Read a user's plan-versus-actual adherence index, rebuilding whichever side
+    of the join changed behind its back.
+
+    Returns:
+        dict: The index, or None if the user has neither a log nor an exercise memory
+    """
+    log_file, plan_file = log_path(username), memory_path(username)
+    log_mtime = os.path.getmtime(log_file) if os.path.exists(log_file) else None
+    plan_mtime = os.path.getmtime(plan_file) if os.path.exists(plan_file) else None
+    if log_mtime is None and plan_mtime is None:
+        return None
+    index = read_adherence(username)
+    if index is None:
+        index = build_adherence(read_log(username), read_plans(username), exercise_names(username), log_mtime, plan_mtime)
+    else:
+        log_stale, plans_stale = index.get('log_mtime') != log_mtime, index.get('plan_mtime') != plan_mtime
+        if not (log_stale or plans_stale):
+            return index
+        if log_stale:
+            index['logged'] = logged_index(read_log(username))
+            index['log_mtime'] = log_mtime
+        if plans_stale:
+            index['plans'] = plan_entries(read_plans(username), exercise_names(username))
+            index['plan_mtime'] = plan_mtime
+        probe_all(index)
+    write_adherence(username, index)
+    return index
@@ -1,4 +1,5 @@
 import streamlit as st
+from core.profiling import get_profiler
 
 login = st.Page("login_auth.py", title = "Login", default = True)
 workout = st.Page("workout.py", title= "workout", )
@@ -8,4 +9,10 @@ workout_log = st.Page("workout_log.py", title = "workout log")
 
 pg = st.navigation([login, workout, workout_log, analysis, calendar])
 st.set_page_config(page_title="Document", page_icon=":material/edit:")
-pg.run()
\ No newline at end of file
+
+# Set WORKOUT_PROFILE=1 to time every rerun and keep cProfile stats of slow ones (see core/profiling.py)
+profiler = get_profiler()
+if profiler is not None:
+    profiler.run(pg.title.replace(" ", "_"), pg.run)
+else:
+    pg.run()
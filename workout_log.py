@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
-from workout import ExerciseMemoryTracker
+from core.workout_store import delete_logs, read_log, upsert_logs, write_log
+from core.workout_schema import editor_frame, is_on_day, workout_frame
+from core.profiling import section
+from core.reference_data import reference_data
+from core.exercise_names import exercise_names
 from datetime import datetime
 import json
-import os
 
 
 def load_exercise_data(username):
@@ -19,38 +21,41 @@ def load_exercise_data(username):
         with open(log_file, 'r') as f:
             memories = json.load(f)
         
-        if not memories:
-            return None
-
-        df = pd.DataFrame(memories)
-
-        df['date'] = pd.to_datetime(df['date'])
-
-        required_columns = [
-            'username', 'date', 'exercise_name', 'muscle_group', 
-            'workout_type', 'difficulty', 
-            'lbs/bw_reps for first set',
-            'lbs/bw_reps for second set', 
-            'lbs/bw_reps for third set'
-        ]
-        
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = "NA"
-                
-        return df
-        
+        return workout_frame(memories, parse_sets=False, username=username)
     except FileNotFoundError:
         return None
     except Exception as e:
         st.error(f"Error loading workout data: {str(e)}")
         return None
 
-def create_editable_log(df, username, muscle_list):
+def valid_entries(records, reference):
+    """
+    Check entries against the reference lists before they are saved, showing an
+    error for the ones that do not match.
+
+    Returns:
+        bool: Whether every entry is valid
+    """
+    invalid = reference.invalid_entries(records)
+    if not invalid:
+        return True
+    lines = [
+        f"- {records[i].get('exercise_name') or 'Unnamed exercise'} on {records[i].get('date')}: "
+        + ", ".join(f"{field} '{value}'" for field, value in fields)
+        for i, fields in invalid[:10]
+    ]
+    if len(invalid) > 10:
+        lines.append(f"- and {len(invalid) - 10} more")
+    st.error("Nothing was saved. These entries have a muscle group, workout type, difficulty "
+             "or equipment that is not in the lists:\n" + "\n".join(lines))
+    return False
+
+def create_editable_log(df, username, reference):
     """Create an editable workout log interface"""
     if df is None:
         return None
 
+    df = editor_frame(df)
     if 'username' not in df.columns:
         df.insert(0, 'username', username)
 
@@ -59,18 +64,17 @@ def create_editable_log(df, username, muscle_list):
         column_config={
             "muscle_group": st.column_config.SelectboxColumn(
                 "Muscle Group",
-                options=muscle_list,
+                options=reference.muscles,
                 required=True
             ),
             "workout_type": st.column_config.SelectboxColumn(
                 "Workout Type",
-                options=['cardio', 'olympic_weightlifting', 'plyometrics', 
-                        'powerlifting', 'strength', 'stretching', 'strongman'],
+                options=reference.workout_types,
                 required=True
             ),
             "difficulty": st.column_config.SelectboxColumn(
                 "Difficulty",
-                options=['beginner', 'intermediate', 'expert'],
+                options=reference.difficulties,
                 required=True
             ),
             "exercise_name": st.column_config.TextColumn(
@@ -96,20 +100,16 @@ def create_editable_log(df, username, muscle_list):
     
 if 'username' in st.session_state:
     username = st.session_state.username[0]
-    df = load_exercise_data(username)
+    with section('load'):
+        df = load_exercise_data(username)
     st.title("Log Your Workouts Here")
     st.write("Today's Date: ", str(datetime.now().date()))
 
-    muscle_list_df = pd.read_csv('file/muscle_list.csv')
-    equipment_df = pd.read_csv('file/workout_equipments.csv')
-
-    muscle_list = muscle_list_df['muscle'].tolist()
-    equipment_list = equipment_df['Equipment Name'].tolist()
+    reference = reference_data()
 
     if df is not None:
-        df['date'] = df['date'].apply(lambda x: x.strftime('%Y-%m-%d'))
-        df_today = df[df['date'] == str(datetime.now().date())]
-        data_for_editor = df_today[['date', 'exercise_name', 'muscle_group', 'workout_type', 'difficulty']]
+        df_today = df[is_on_day(df, datetime.now().date())]
+        data_for_editor = editor_frame(df_today, ['date', 'exercise_name', 'muscle_group', 'workout_type', 'difficulty'])
         username_column = [username] * len(data_for_editor)
         data_for_editor.insert(0, 'username', username_column)
         data_for_editor['lbs/bw_reps for first set'] = "NA"
@@ -121,17 +121,17 @@ if 'username' in st.session_state:
             column_config={
                 "muscle_group": st.column_config.SelectboxColumn(
                     "Muscle Group",
-                    options=muscle_list,
+                    options=reference.muscles,
                     required=True
                 ),
                 "workout_type": st.column_config.SelectboxColumn(
                     "Workout Type",
-                    options=['cardio', 'olympic_weightlifting', 'plyometrics', 'powerlifting', 'strength', 'stretching', 'strongman'],
+                    options=reference.workout_types,
                     required=True
                 ),
                 "difficulty": st.column_config.SelectboxColumn(
                     "Difficulty",
-                    options=['beginner', 'intermediate', 'expert'],
+                    options=reference.difficulties,
                     required=True
                 ),
                 "exercise_name": st.column_config.TextColumn("Exercise Name")
@@ -141,21 +141,11 @@ if 'username' in st.session_state:
 
         save = st.button("Save Log", icon="💾")
         if save:
-            os.makedirs('file', exist_ok=True)
-            log_file = f"file/workout_log_hist_{username}.json"
-
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    try:
-                        memories = json.load(f)
-                    except json.JSONDecodeError:
-                        memories = []
-            else:
-                memories = []
+            memories = read_log(username)
 
             updated_data = edited_df.to_dict(orient='records')
-            for record in updated_data:
-                workout_hist = {
+            workout_hists = [
+                {
                     "username": record['username'],
                     "date": record['date'],
                     "exercise_name": record['exercise_name'],
@@ -166,32 +156,23 @@ if 'username' in st.session_state:
                     "lbs/bw_reps for second set": record['lbs/bw_reps for second set'],
                     "lbs/bw_reps for third set": record['lbs/bw_reps for third set']
                 }
+                for record in updated_data
+            ]
+            if valid_entries(workout_hists, reference):
+                memories = upsert_logs(username, memories, workout_hists)
 
-                memories = [
-                    memory for memory in memories
-                    if not (
-                        memory['exercise_name'] == workout_hist['exercise_name'] and
-                        memory['date'] == workout_hist['date']
-                    )
-                ]
-                memories.append(workout_hist)
-
-            with open(log_file, 'w') as f:
-                json.dump(memories, f, indent=2)
-            st.success("Workout log successfully saved!")
+                write_log(username, memories, changed_dates=[record['date'] for record in updated_data])
+                st.success("Workout log successfully saved!")
 
     st.write("---")
 
     st.subheader("Add New Log")
     with st.form("add_log"):
         exercise_name = st.text_input("Exercise Name")
-        muscle_group = st.selectbox("Muscle Group", options=muscle_list)
-        workout_type = st.selectbox(
-            "Workout Type", 
-            options=['cardio', 'olympic_weightlifting', 'plyometrics', 'powerlifting', 'strength', 'stretching', 'strongman']
-        )
-        difficulty = st.selectbox("Difficulty", options=['beginner', 'intermediate', 'expert'])
-        equipment_used = st.selectbox("Equipment Used", options=equipment_list)
+        muscle_group = st.selectbox("Muscle Group", options=reference.muscles)
+        workout_type = st.selectbox("Workout Type", options=reference.workout_types)
+        difficulty = st.selectbox("Difficulty", options=reference.difficulties)
+        equipment_used = st.selectbox("Equipment Used", options=reference.equipment)
         first_set = st.text_input("First Set (lbs/bw_reps)")
         second_set = st.text_input("Second Set (lbs/bw_reps)")
         third_set = st.text_input("Third Set (lbs/bw_reps)")
@@ -210,23 +191,17 @@ if 'username' in st.session_state:
                 "lbs/bw_reps for second set": second_set,
                 "lbs/bw_reps for third set": third_set
             }
-            log_file = f"file/workout_log_hist_{username}.json"
-            os.makedirs('file', exist_ok=True)
-
-            # Load existing logs and append
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    try:
-                        memories = json.load(f)
-                    except json.JSONDecodeError:
-                        memories = []
-            else:
-                memories = []
-            
-            memories.append(new_log)
-            with open(log_file, 'w') as f:
-                json.dump(memories, f, indent=2)
-            st.success("Log added successfully!")
+            if valid_entries([new_log], reference):
+                # Load existing logs and append
+                memories = read_log(username)
+                # Close spellings are only suggested, never merged on their own
+                suggestion = exercise_names(username).suggest(exercise_name)
+                memories.append(new_log)
+                write_log(username, memories, changed_dates=[new_log['date']])
+                st.success("Log added successfully!")
+                if suggestion:
+                    st.info(f"'{exercise_name}' was saved as a new exercise. If you meant '{suggestion}', "
+                            "rename it in the workout history below so both are counted together.")
 
     st.subheader("Delete Logs")
     if df is not None:
@@ -237,21 +212,15 @@ if 'username' in st.session_state:
         )
 
         if st.button("Delete Selected Logs"):
-            log_file = f"file/workout_log_hist_{username}.json"
-            with open(log_file, 'r') as f:
-                memories = json.load(f)
+            memories = read_log(username)
 
-            memories = [
-                memory for memory in memories
-                if not any(
-                    edited_df.loc[i, 'exercise_name'] == memory['exercise_name'] and
-                    edited_df.loc[i, 'date'] == memory['date']
-                    for i in delete_index
-                )
-            ]
+            memories = delete_logs(
+                username,
+                memories,
+                [(edited_df.loc[i, 'exercise_name'], edited_df.loc[i, 'date']) for i in delete_index]
+            )
 
-            with open(log_file, 'w') as f:
-                json.dump(memories, f, indent=2)
+            write_log(username, memories, changed_dates=[edited_df.loc[i, 'date'] for i in delete_index])
             st.success("Selected logs deleted successfully!")
         
     if df is not None:
@@ -259,17 +228,15 @@ if 'username' in st.session_state:
         
         st.subheader("Edit Complete Workout History")
         st.write("Edit any previous workout entries in your log.")
-        edited_df = create_editable_log(df, username, muscle_list)
+        with section('render'):
+            edited_df = create_editable_log(df, username, reference)
         
         save_edits = st.button("Save All Changes", icon="💾", key="save_edits")
         if save_edits and edited_df is not None:
-            os.makedirs('file', exist_ok=True)
-            log_file = f"file/workout_log_hist_{username}.json"
-
             updated_data = edited_df.to_dict(orient='records')
 
-            with open(log_file, 'w') as f:
-                json.dump(updated_data, f, indent=2)
-            st.success("Your workout history has been successfully updated!")
+            if valid_entries(updated_data, reference):
+                write_log(username, updated_data)
+                st.success("Your workout history has been successfully updated!")
 else:
     st.warning("Please login before recording your workouts.")